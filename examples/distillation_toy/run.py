@@ -1,7 +1,7 @@
 import argparse
 import json
-import os
 import random
+import sys
 from pathlib import Path
 
 import numpy as np
@@ -9,6 +9,9 @@ import torch
 import torch.nn as nn
 import torch.optim as optim
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools"))
+from collect_env import device_info  # noqa: E402
+
 
 def set_seed(seed: int) -> None:
     random.seed(seed)
@@ -98,7 +101,7 @@ def write_results(out_dir: Path, acc_plain: float, acc_kd: float) -> None:
             "quant_profile": "n/a",
             "backend": "pytorch",
         },
-        "device": {"os": os.name, "cpu": "unknown", "ram_gb": "unknown"},
+        "device": device_info(),
         "metrics": {
             "load_time_ms_p50": 0,
             "load_time_ms_p95": 0,
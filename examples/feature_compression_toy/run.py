@@ -1,11 +1,14 @@
 import argparse
 import json
-import os
+import sys
 from dataclasses import dataclass
 from pathlib import Path
 
 import numpy as np
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools"))
+from collect_env import device_info  # noqa: E402
+
 
 @dataclass
 class Row:
@@ -67,7 +70,7 @@ def write_results(out_dir: Path, rows: list[Row], seed: int, n: int, d: int, ban
             "quant_profile": "2/4/8 bits",
             "backend": "numpy",
         },
-        "device": {"os": os.name, "cpu": "unknown", "ram_gb": "unknown"},
+        "device": device_info(),
         "metrics": {
             "load_time_ms_p50": 0,
             "load_time_ms_p95": 0,
@@ -1,7 +1,6 @@
 import argparse
 import json
 import os
-import platform
 import re
 import subprocess
 import sys
@@ -9,6 +8,9 @@ import tempfile
 import time
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools"))
+from collect_env import device_info  # noqa: E402
+
 
 def _run(cmd: list[str], cwd: Path | None = None) -> float:
     t0 = time.perf_counter()
@@ -300,9 +302,7 @@ def _write_results(
         f"vmaf_model={vmaf_model}, n_subsample={n_subsample}"
     )
     tmpl["baseline"]["backend"] = "ffmpeg+libsvtav1+libvmaf"
-    tmpl["device"]["os"] = platform.platform()
-    tmpl["device"]["cpu"] = platform.processor() or "unknown"
-    tmpl["device"]["ram_gb"] = "unknown"
+    tmpl["device"] = device_info()
 
     in_size = float(input_path.stat().st_size)
     plain_size = float(out_plain.stat().st_size)
@@ -1,12 +1,15 @@
 import argparse
 import json
-import os
+import sys
 import time
 from dataclasses import dataclass
 from pathlib import Path
 
 import numpy as np
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools"))
+from collect_env import device_info  # noqa: E402
+
 
 def _save_json(path: Path, obj: dict) -> None:
     path.write_text(json.dumps(obj, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
@@ -105,7 +108,7 @@ def write_results(out_dir: Path, dq: dict, reg: dict, seed: int, n: int, d: int)
             "quant_profile": "n/a",
             "backend": "numpy",
         },
-        "device": {"os": os.name, "cpu": "unknown", "ram_gb": "unknown"},
+        "device": device_info(),
         "metrics": {
             "load_time_ms_p50": 0,
             "load_time_ms_p95": 0,
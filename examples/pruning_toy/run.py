@@ -1,8 +1,8 @@
 import argparse
 import json
 import math
-import os
 import random
+import sys
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -11,6 +11,9 @@ import torch
 import torch.nn as nn
 import torch.optim as optim
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools"))
+from collect_env import device_info  # noqa: E402
+
 
 def set_seed(seed: int) -> None:
     random.seed(seed)
@@ -118,7 +121,7 @@ def write_results(out_dir: Path, m: Metrics) -> None:
             "quant_profile": "n/a",
             "backend": "pytorch",
         },
-        "device": {"os": os.name, "cpu": "unknown", "ram_gb": "unknown"},
+        "device": device_info(),
         "metrics": {
             "load_time_ms_p50": 0,
             "load_time_ms_p95": 0,
@@ -1,11 +1,15 @@
 import argparse
 import json
 import os
-import platform
 import subprocess
 import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools"))
+from collect_env import device_info  # noqa: E402
+import tracing  # noqa: E402
+from umc import PackWriter  # noqa: E402
+
 
 def _run(cmd: list[str], cwd: Path | None = None) -> None:
     subprocess.check_call(cmd, cwd=str(cwd) if cwd else None)
@@ -31,27 +35,33 @@ def main() -> int:
     p.add_argument("--threads", type=int, default=0)
     p.add_argument("--size-mb", type=int, default=256)
     p.add_argument("--iters", type=int, default=20)
+    p.add_argument("--trace", action="store_true", help="Write artifacts/trace.json with per-step timings")
+    p.add_argument("--trace-chrome", default="", help="Also write a Chrome trace-event file to this path")
     args = p.parse_args()
+    if args.trace:
+        tracing.enable()  # staged into the pack below rather than flushed at exit
 
     root = Path(__file__).resolve().parent
     artifacts = root / "artifacts"
-    artifacts.mkdir(parents=True, exist_ok=True)
 
     # 1) Build + run microbench
-    exe = _cmake_build(root, root / "build")
+    with tracing.span("build"):
+        exe = _cmake_build(root, root / "build")
     threads = args.threads if args.threads > 0 else (os.cpu_count() or 1)
 
-    out = subprocess.check_output(
-        [str(exe), "--threads", str(threads), "--size_mb", str(args.size_mb), "--iters", str(args.iters)],
-        cwd=str(root),
-    )
+    with tracing.span("mem_bw", threads=threads, size_mb=args.size_mb, iters=args.iters):
+        out = subprocess.check_output(
+            [str(exe), "--threads", str(threads), "--size_mb", str(args.size_mb), "--iters", str(args.iters)],
+            cwd=str(root),
+        )
     bench = json.loads(out.decode("utf-8"))
     (root / "bench.json").write_text(json.dumps(bench, indent=2, ensure_ascii=False), encoding="utf-8")
 
     # 2) env.json
-    tools_dir = root.parent.parent / "tools"
     templates_dir = root.parent.parent / "templates"
-    _run([sys.executable, str(tools_dir / "collect_env.py"), "--out", str(artifacts / "env.json")])
+    pack = PackWriter(artifacts)
+    with tracing.span("collect_env"):
+        pack.write_env()
 
     # 3) results.json (minimal schema) + report.md
     tmpl = json.loads((templates_dir / "results.json").read_text(encoding="utf-8"))
@@ -60,9 +70,7 @@ def main() -> int:
     tmpl["baseline"]["version"] = "0.1"
     tmpl["baseline"]["quant_profile"] = "n/a"
     tmpl["baseline"]["backend"] = "cpp"
-    tmpl["device"]["os"] = platform.platform()
-    tmpl["device"]["cpu"] = platform.processor() or "unknown"
-    tmpl["device"]["ram_gb"] = "unknown"
+    tmpl["device"] = device_info()
 
     elapsed_ms = float(bench.get("elapsed_ms", 0.0))
     tmpl["metrics"]["load_time_ms_p50"] = elapsed_ms
@@ -75,7 +83,7 @@ def main() -> int:
         f"threads={bench.get('threads')}, size_mb={bench.get('size_mb')}, iters={bench.get('iters')}, "
         f"throughput_gb_s={bench.get('throughput_gb_s')}"
     )
-    (artifacts / "results.json").write_text(json.dumps(tmpl, indent=2, ensure_ascii=False), encoding="utf-8")
+    pack.write_results(tmpl)
 
     report = f"""# system_perf_microbench — 一页报告
 
@@ -97,21 +105,15 @@ def main() -> int:
 - 本示例不绑定特定厂商 SDK；用于展示方法论与可复现闭环
 - 真正的异构场景（GPU/互联/NUMA）可在此基础上扩展测量口径与门禁
 """
-    (artifacts / "report.md").write_text(report, encoding="utf-8")
-
-    # 4) manifest.json
-    _run(
-        [
-            sys.executable,
-            str(tools_dir / "make_manifest.py"),
-            "--dir",
-            str(artifacts),
-            "--out",
-            str(artifacts / "manifest.json"),
-        ]
-    )
-    _run([sys.executable, str(tools_dir / "verify_manifest.py"), "--manifest", str(artifacts / "manifest.json")])
-    _run([sys.executable, str(tools_dir / "validate_artifacts.py"), "--artifacts", str(artifacts)])
+    pack.write_report(report)
+
+    tracing.counter("throughput_gb_s", float(bench.get("throughput_gb_s") or 0.0))
+    if args.trace:
+        # Staged with the pack so trace.json is committed atomically and covered by the manifest.
+        pack.write_trace(chrome_path=args.trace_chrome)
+
+    # 4) manifest.json + validation
+    pack.finalize()
 
     return 0
 
@@ -1,32 +1,34 @@
+import argparse
 import json
-import platform
 import sys
 import time
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools"))
+import tracing  # noqa: E402
+from collect_env import device_info  # noqa: E402
+from umc import PackWriter  # noqa: E402
 
-def _write_artifacts(artifacts: Path, results: dict, report: str) -> None:
-    tools_dir = artifacts.parent.parent.parent / "tools"
-    subprocess = __import__("subprocess")
-    artifacts.mkdir(parents=True, exist_ok=True)
-    subprocess.check_call([sys.executable, str(tools_dir / "collect_env.py"), "--out", str(artifacts / "env.json")])
-    (artifacts / "results.json").write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
-    (artifacts / "report.md").write_text(report, encoding="utf-8")
-    subprocess.check_call(
-        [
-            sys.executable,
-            str(tools_dir / "make_manifest.py"),
-            "--dir",
-            str(artifacts),
-            "--out",
-            str(artifacts / "manifest.json"),
-        ]
-    )
-    subprocess.check_call([sys.executable, str(tools_dir / "verify_manifest.py"), "--manifest", str(artifacts / "manifest.json")])
-    subprocess.check_call([sys.executable, str(tools_dir / "validate_artifacts.py"), "--artifacts", str(artifacts)])
+
+def _write_artifacts(artifacts: Path, results: dict, report: str, trace: bool, trace_chrome: str) -> None:
+    pack = PackWriter(artifacts)
+    with tracing.span("collect_env"):
+        pack.write_env()
+    pack.write_results(results)
+    pack.write_report(report)
+    if trace:
+        pack.write_trace(chrome_path=trace_chrome)
+    pack.finalize()
 
 
 def main() -> int:
+    p = argparse.ArgumentParser()
+    p.add_argument("--trace", action="store_true", help="Write artifacts/trace.json with per-step timings")
+    p.add_argument("--trace-chrome", default="", help="Also write a Chrome trace-event file to this path")
+    args = p.parse_args()
+    if args.trace:
+        tracing.enable()  # staged into the pack by _write_artifacts rather than flushed at exit
+
     root = Path(__file__).resolve().parent
     artifacts = root / "artifacts"
     templates_dir = root.parent.parent / "templates"
@@ -36,9 +38,7 @@ def main() -> int:
     tmpl["baseline"]["version"] = "0.1"
     tmpl["baseline"]["quant_profile"] = "n/a"
     tmpl["baseline"]["backend"] = "triton"
-    tmpl["device"]["os"] = platform.platform()
-    tmpl["device"]["cpu"] = platform.processor() or "unknown"
-    tmpl["device"]["ram_gb"] = "unknown"
+    tmpl["device"] = device_info()
 
     bench = {"status": "skipped", "reason": ""}
     report_lines = [
@@ -74,16 +74,18 @@ def main() -> int:
             z = torch.empty_like(x)
 
             grid = lambda meta: (triton.cdiv(n, meta["BLOCK"]),)
-            # warmup
-            add_kernel[grid](x, y, z, n, BLOCK=1024)
-            torch.cuda.synchronize()
+            # warmup (includes JIT compilation)
+            with tracing.span("warmup", block=1024):
+                add_kernel[grid](x, y, z, n, BLOCK=1024)
+                torch.cuda.synchronize()
 
             iters = 50
-            t0 = time.time()
-            for _ in range(iters):
-                add_kernel[grid](x, y, z, n, BLOCK=1024)
-            torch.cuda.synchronize()
-            t1 = time.time()
+            with tracing.span("add_kernel", n=n, iters=iters):
+                t0 = time.time()
+                for _ in range(iters):
+                    add_kernel[grid](x, y, z, n, BLOCK=1024)
+                torch.cuda.synchronize()
+                t1 = time.time()
 
             elapsed_s = (t1 - t0)
             bytes_per_iter = n * 2  # fp16 bytes per element
@@ -102,6 +104,7 @@ def main() -> int:
             }
     except Exception as e:
         bench["reason"] = f"{type(e).__name__}: {e}"
+        tracing.instant("skipped", reason=type(e).__name__)
 
     (root / "bench.json").write_text(json.dumps(bench, indent=2, ensure_ascii=False), encoding="utf-8")
 
@@ -131,7 +134,7 @@ def main() -> int:
         ]
 
     report = "\n".join(report_lines) + "\n"
-    _write_artifacts(artifacts, tmpl, report)
+    _write_artifacts(artifacts, tmpl, report, args.trace, args.trace_chrome)
     return 0
 
 
@@ -1,6 +1,6 @@
 import argparse
 import json
-import os
+import sys
 import time
 from dataclasses import dataclass
 from pathlib import Path
@@ -10,6 +10,9 @@ import torch
 import torch.nn as nn
 import torch.nn.functional as F
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools"))
+from collect_env import device_info  # noqa: E402
+
 
 def set_seed(seed: int) -> None:
     np.random.seed(seed)
@@ -113,7 +116,7 @@ def write_results(out_dir: Path, seed: int, n: int, d_in: int, d_proj: int, m_li
             "quant_profile": "n/a",
             "backend": "pytorch",
         },
-        "device": {"os": os.name, "cpu": "unknown", "ram_gb": "unknown"},
+        "device": device_info(),
         "metrics": {
             # required fields for public validator
             "load_time_ms_p50": 0,
@@ -1,9 +1,15 @@
+import argparse
 import json
 import platform
 import subprocess
 import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools"))
+import tracing  # noqa: E402
+from collect_env import device_info  # noqa: E402
+from umc import PackWriter  # noqa: E402
+
 
 def _try_run(cmd: list[str]) -> tuple[int, str]:
     try:
@@ -16,15 +22,21 @@ def _try_run(cmd: list[str]) -> tuple[int, str]:
 
 
 def main() -> int:
+    p = argparse.ArgumentParser()
+    p.add_argument("--trace", action="store_true", help="Write artifacts/trace.json with per-step timings")
+    p.add_argument("--trace-chrome", default="", help="Also write a Chrome trace-event file to this path")
+    args = p.parse_args()
+    if args.trace:
+        tracing.enable()  # staged into the pack below rather than flushed at exit
+
     root = Path(__file__).resolve().parent
     artifacts = root / "artifacts"
-    artifacts.mkdir(parents=True, exist_ok=True)
-
-    tools_dir = root.parent.parent / "tools"
     templates_dir = root.parent.parent / "templates"
 
     # env.json
-    subprocess.check_call([sys.executable, str(tools_dir / "collect_env.py"), "--out", str(artifacts / "env.json")])
+    pack = PackWriter(artifacts)
+    with tracing.span("collect_env"):
+        pack.write_env()
 
     # Topology snapshot (best-effort, no hard dependency)
     topo: dict[str, object] = {
@@ -33,10 +45,12 @@ def main() -> int:
         "nvidia_smi": {},
     }
 
-    code, txt = _try_run(["nvidia-smi", "-L"])
+    with tracing.span("nvidia_smi_list"):
+        code, txt = _try_run(["nvidia-smi", "-L"])
     topo["nvidia_smi"]["list_code"] = code
     topo["nvidia_smi"]["list"] = txt
-    code, txt = _try_run(["nvidia-smi", "--query-gpu=name,memory.total,driver_version", "--format=csv,noheader"])
+    with tracing.span("nvidia_smi_query"):
+        code, txt = _try_run(["nvidia-smi", "--query-gpu=name,memory.total,driver_version", "--format=csv,noheader"])
     topo["nvidia_smi"]["query_code"] = code
     topo["nvidia_smi"]["query"] = txt
 
@@ -49,16 +63,14 @@ def main() -> int:
     tmpl["baseline"]["version"] = "0.1"
     tmpl["baseline"]["quant_profile"] = "n/a"
     tmpl["baseline"]["backend"] = "n/a"
-    tmpl["device"]["os"] = platform.platform()
-    tmpl["device"]["cpu"] = platform.processor() or "unknown"
-    tmpl["device"]["ram_gb"] = "unknown"
+    tmpl["device"] = device_info()
     tmpl["metrics"]["load_time_ms_p50"] = 0.0
     tmpl["metrics"]["load_time_ms_p95"] = 0.0
     tmpl["metrics"]["peak_memory_mb"] = 0.0
     tmpl["metrics"]["long_run_minutes"] = 0.0
     tmpl["metrics"]["crash_count"] = 0
     tmpl["notes"] = "enablement skeleton: topology snapshot + delivery template; no performance claim."
-    (artifacts / "results.json").write_text(json.dumps(tmpl, indent=2, ensure_ascii=False), encoding="utf-8")
+    pack.write_results(tmpl)
 
     report = """# vllm_sglang_enablement_skeleton — 一页报告
 
@@ -72,21 +84,13 @@ def main() -> int:
 ## 声明
 本示例不包含权重/私有数据，不对性能结果做前瞻承诺。
 """
-    (artifacts / "report.md").write_text(report, encoding="utf-8")
-
-    # manifest
-    subprocess.check_call(
-        [
-            sys.executable,
-            str(tools_dir / "make_manifest.py"),
-            "--dir",
-            str(artifacts),
-            "--out",
-            str(artifacts / "manifest.json"),
-        ]
-    )
-    subprocess.check_call([sys.executable, str(tools_dir / "verify_manifest.py"), "--manifest", str(artifacts / "manifest.json")])
-    subprocess.check_call([sys.executable, str(tools_dir / "validate_artifacts.py"), "--artifacts", str(artifacts)])
+    pack.write_report(report)
+    if args.trace:
+        # Staged with the pack so trace.json is committed atomically and covered by the manifest.
+        pack.write_trace(chrome_path=args.trace_chrome)
+
+    # manifest + validation
+    pack.finalize()
     return 0
 
 
@@ -1,23 +1,33 @@
+param(
+  # Optional baseline pack (artifacts directory or results.json): also gate on a statistically significant regression.
+  [string]$Baseline = "",
+  [double]$RegressionThresholdPct = 5
+)
+
 Set-StrictMode -Version Latest
 $ErrorActionPreference = "Stop"
 
 Push-Location $PSScriptRoot/..
 try {
-  Write-Host "[1/4] validate artifacts"
+  $steps = if ($Baseline) { 3 } else { 2 }
+  Write-Host "[1/$steps] validate artifacts"
   python .\tools\validate_artifacts.py --artifacts .\artifacts
+  if ($LASTEXITCODE -ne 0) { throw "artifact validation failed (exit $LASTEXITCODE)" }
 
-  Write-Host "[2/4] verify manifest"
-  python .\tools\verify_manifest.py --manifest .\artifacts\manifest.json
-
-  Write-Host "[3/4] redaction scan (default: absolute paths)"
-  python .\tools\scan_redaction.py --root .
+  # One tree walk covers: manifest verification, redaction scan (default: absolute paths), forbidden weight/data scan.
+  # The standalone tools (verify_manifest / scan_redaction / check_no_forbidden_files) remain available.
+  Write-Host "[2/$steps] single-pass audit (manifest + redaction + forbidden files)"
+  python .\tools\audit_public.py --root . --manifest .\artifacts\manifest.json
+  if ($LASTEXITCODE -ne 0) { throw "public audit failed (exit $LASTEXITCODE)" }
 
-  Write-Host "[4/4] forbidden weight/data scan"
-  python .\tools\check_no_forbidden_files.py --root .
+  if ($Baseline) {
+    Write-Host "[3/$steps] regression gate vs baseline"
+    python .\tools\compare_results.py --baseline $Baseline --candidate .\artifacts --threshold-pct $RegressionThresholdPct
+    if ($LASTEXITCODE -ne 0) { throw "regression gate failed (exit $LASTEXITCODE)" }
+  }
 
   Write-Host "OK: public audit passed"
 } finally {
   Pop-Location
 }
 
-
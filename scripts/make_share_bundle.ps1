@@ -1,3 +1,10 @@
+param(
+  # Optional: also append the bundle contents as one pack to a deduplicated archive (tools/evidence_bundle.py),
+  # e.g. -Archive ..\_archive\share_bundles.zip; the pack is named after the UTC time unless -PackName is given.
+  [string]$Archive = "",
+  [string]$PackName = ""
+)
+
 Set-StrictMode -Version Latest
 $ErrorActionPreference = "Stop"
 
@@ -20,6 +27,12 @@ try {
   Copy-Item ".\artifacts\*" "$outDir\artifacts\" -Force
 
   Write-Host "OK: share bundle generated at $outDir (do not include any weights/data)"
+
+  if ($Archive) {
+    $name = if ($PackName) { $PackName } else { (Get-Date).ToUniversalTime().ToString("yyyyMMddTHHmmssZ") }
+    python .\tools\evidence_bundle.py add --bundle $Archive --name $name --dir $outDir
+    if ($LASTEXITCODE -ne 0) { throw "evidence_bundle add failed (exit $LASTEXITCODE)" }
+  }
 } finally {
   Pop-Location
 }
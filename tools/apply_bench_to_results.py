@@ -3,6 +3,30 @@ import json
 from pathlib import Path
 
 
+# Metrics written only when bench.json carries them (tools/bench_llamacpp_cpu.py; not the PowerShell driver).
+OPTIONAL_METRICS = [
+    "long_run_runs",
+    "long_run_workers",
+    "long_run_throughput_drift_pct",
+    "long_run_latency_drift_pct",
+    "load_time_ms_p90",
+    "load_time_ms_p99",
+    "load_time_ms_max",
+    "load_time_ms_histogram",
+    *(f"{kind}_tokens_per_s_{q}" for kind in ("pp", "tg") for q in ("min", "p50", "p90", "p95", "p99", "max")),
+    "load_time_ms_warm_p50",
+    "load_time_ms_warm_p95",
+    "load_time_ms_warm_p99",
+    "load_mode",
+    "cold_cache_evicted",
+    "load_time_ms_samples",
+    "load_time_ms_warm_samples",
+    "pp_tokens_per_s_samples",
+    "tg_tokens_per_s_samples",
+    "peak_memory_mb_samples",
+]
+
+
 def _load_json(path: Path) -> dict:
     return json.loads(path.read_text(encoding="utf-8"))
 
@@ -63,6 +87,58 @@ def main() -> int:
     results["metrics"]["peak_memory_mb"] = float(peak_rss)
     results["metrics"]["long_run_minutes"] = float(long_run)
     results["metrics"]["crash_count"] = float(crash)
+    # Drop optional metrics from an earlier apply: a bench.json without them must not leave stale values behind.
+    for key in OPTIONAL_METRICS:
+        results["metrics"].pop(key, None)
+    # Optional soak aggregates (tools/bench_llamacpp_cpu.py); absent in bench.json from the PowerShell driver.
+    for src, dst in [
+        ("runs", "long_run_runs"),
+        ("workers", "long_run_workers"),
+        ("throughput_drift_pct", "long_run_throughput_drift_pct"),
+        ("latency_drift_pct", "long_run_latency_drift_pct"),
+    ]:
+        v = _num(stability.get(src))
+        if v is not None:
+            results["metrics"][dst] = float(v)
+    # Optional distributions (tools/bench_llamacpp_cpu.py): tail latency and prompt/generation tokens/s.
+    load = m.get("load_time_ms") or {}
+    for q in ("p90", "p99", "max"):
+        v = _num(load.get(q))
+        if v is not None:
+            results["metrics"][f"load_time_ms_{q}"] = float(v)
+    if isinstance(load.get("histogram"), list) and load["histogram"]:
+        results["metrics"]["load_time_ms_histogram"] = load["histogram"]
+    for kind in ("pp", "tg"):
+        dist = m.get(f"{kind}_tokens_per_s") or {}
+        for q in ("min", "p50", "p90", "p95", "p99", "max"):
+            v = _num(dist.get(q))
+            if v is not None:
+                results["metrics"][f"{kind}_tokens_per_s_{q}"] = float(v)
+    # Warm-start series next to the cold-start load_time_ms (MEASURE.md), plus how the model was loaded.
+    warm = m.get("load_time_ms_warm") or {}
+    for q in ("p50", "p95", "p99"):
+        v = _num(warm.get(q))
+        if v is not None:
+            results["metrics"][f"load_time_ms_warm_{q}"] = float(v)
+    if m.get("load_mode") in ("mmap", "read"):
+        results["metrics"]["load_mode"] = m["load_mode"]
+    if isinstance(m.get("cold_cache_evicted"), bool):
+        results["metrics"]["cold_cache_evicted"] = m["cold_cache_evicted"]
+    # Raw per-run samples, for statistical comparison between packs (tools/compare_results.py).
+    for src, dst in [
+        (load.get("samples"), "load_time_ms_samples"),
+        (warm.get("samples"), "load_time_ms_warm_samples"),
+        ((m.get("pp_tokens_per_s") or {}).get("samples"), "pp_tokens_per_s_samples"),
+        ((m.get("tg_tokens_per_s") or {}).get("samples"), "tg_tokens_per_s_samples"),
+        (m.get("peak_rss_mb_samples"), "peak_memory_mb_samples"),
+    ]:
+        if isinstance(src, list) and src and all(_num(v) is not None for v in src):
+            results["metrics"][dst] = [float(v) for v in src]
+    # The generic throughput fields track generation speed; without it they go back to the template's 0.0
+    # rather than keep an earlier run's value under this run's notes and status.
+    for q in ("p50", "p95"):
+        v = _num((m.get("tg_tokens_per_s") or {}).get(q))
+        results["metrics"][f"throughput_tokens_per_s_{q}"] = float(v) if v is not None else 0.0
     results["data_status"] = "baseline_measured"
 
     note = "Baseline measured with llama.cpp-bench-cpu. bench.json contains local absolute paths and is not part of evidence artifacts."
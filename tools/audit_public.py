@@ -0,0 +1,216 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from check_no_forbidden_files import FORBIDDEN_SUFFIXES, SNIFF_MIN_SIZE, sniff_file, sniff_header
+from make_manifest import iter_files
+from scan_redaction import DEFAULT_PATTERNS, TEXT_EXTS, PatternSet, StreamScanner, compile_patterns, patterns_for
+
+
+READ_CHUNK = 1024 * 1024
+
+
+def _classify(name: str) -> str:
+    suffix = os.path.splitext(name)[1].lower()
+    if suffix in FORBIDDEN_SUFFIXES:
+        return "forbidden"
+    if suffix in TEXT_EXTS:
+        return "text"
+    return "other"
+
+
+def _read_once(
+    fs_path: str, size: int, want_hash: bool, patterns: PatternSet | None, sniff: bool = False
+) -> tuple[str | None, tuple[str, int, int] | None, str | None, int]:
+    """
+    Read a file once, feeding the same buffer to the hasher, the redaction scanner and the weight sniffer.
+
+    Returns (sha256 or None, first hit as (pattern, line, column) or None, sniffed weight format or None,
+    bytes read). Reading stops early when only the scanner needs the content and it has already matched.
+    """
+    h = hashlib.sha256() if want_hash else None
+    scanner = StreamScanner(patterns) if patterns is not None else None
+    view = memoryview(bytearray(max(1, min(size, READ_CHUNK))))
+    nread = 0
+    kind = None
+    with open(fs_path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(view)
+            if not n:
+                break
+            chunk = view[:n]
+            if sniff and nread == 0:
+                kind = sniff_header(bytes(chunk[:512]), size)
+            nread += n
+            if h is not None:
+                h.update(chunk)
+            if scanner is not None and scanner.feed(chunk) and h is None:
+                break
+    if scanner is not None:
+        scanner.finish()
+    hit = scanner.hits[0] if scanner is not None and scanner.hits else None
+    return (h.hexdigest() if h is not None else None), hit, kind, nread
+
+
+def _load_manifest(path: Path) -> dict[str, dict]:
+    m = json.loads(path.read_text(encoding="utf-8"))
+    base = path.parent
+    out = {}
+    for item in m.get("files", []):
+        rel = item.get("path")
+        if rel:
+            out[os.path.normcase(os.path.abspath(base / rel))] = item
+    return out
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(
+        description="Single-pass public audit: forbidden files + redaction scan + manifest verification in one tree walk."
+    )
+    p.add_argument("--root", default=".", help="Root directory to scan")
+    p.add_argument("--manifest", default="", help="Manifest to verify (default: <root>/artifacts/manifest.json)")
+    p.add_argument("--no-manifest", action="store_true", help="Skip manifest verification")
+    p.add_argument("--pattern", action="append", default=[], help="Additional redaction regex pattern (repeatable)")
+    p.add_argument("--jobs", type=int, default=4, help="Parallel read workers")
+    p.add_argument("--out", default="", help="Optional combined JSON report path (keep it outside the scanned tree)")
+    args = p.parse_args()
+
+    root = Path(args.root).resolve()
+    pattern_list = tuple(list(DEFAULT_PATTERNS) + list(args.pattern or []))
+    compile_patterns(pattern_list)  # fail fast on an invalid --pattern
+
+    manifest_path = None if args.no_manifest else Path(args.manifest) if args.manifest else root / "artifacts" / "manifest.json"
+    expected: dict[str, dict] = {}
+    if manifest_path is not None:
+        if not manifest_path.is_file():
+            print(f"Manifest not found: {manifest_path}")
+            return 2
+        expected = _load_manifest(manifest_path)
+
+    t0 = time.perf_counter()
+    forbidden: list[str] = []
+    redaction: list[dict] = []
+    manifest_problems: list[str] = []
+    seen: set[str] = set()
+    counts = {"files": 0, "read": 0, "bytes_read": 0}
+
+    def _job(rel: str, fs_path: str, size: int, item: dict | None, scan: bool, sniff: bool) -> tuple:
+        if item is None and not scan:
+            # Header-only read for large files that nothing else needs to open.
+            return rel, None, None, None, sniff_file(fs_path, size), 0, None
+        try:
+            patterns = compile_patterns(patterns_for(rel, pattern_list)) if scan else None
+            sha, hit, kind, nread = _read_once(fs_path, size, item is not None, patterns, sniff)
+        except OSError as e:
+            # Unreadable manifest entries are findings; other unreadable files are skipped like the scanner does.
+            err = f"Unreadable: {item['path']} ({e.strerror or e})" if item is not None else None
+            return rel, None, None, None, None, 0, err
+        return rel, item, sha, hit, kind, nread, None
+
+    jobs = []
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        for rel, fs_path, st in iter_files(root, recursive=True):
+            counts["files"] += 1
+            kind = _classify(rel)
+            if kind == "forbidden":
+                forbidden.append(rel)
+            key = os.path.normcase(os.path.abspath(fs_path))
+            item = expected.get(key)
+            if item is not None:
+                seen.add(key)
+                if item.get("size_bytes") is not None and st.st_size != item["size_bytes"]:
+                    manifest_problems.append(f"Size mismatch: {item['path']} expected={item['size_bytes']} actual={st.st_size}")
+                    item = None
+                elif not item.get("sha256"):
+                    item = None
+            sniff = kind != "forbidden" and st.st_size >= SNIFF_MIN_SIZE
+            if item is None and kind != "text" and not sniff:
+                continue
+            jobs.append(pool.submit(_job, rel, fs_path, st.st_size, item, kind == "text", sniff))
+
+        # Manifest entries outside --root (or missing) were not reached by the walk.
+        for key, item in expected.items():
+            if key in seen:
+                continue
+            if not os.path.isfile(key):
+                manifest_problems.append(f"Missing: {item['path']}")
+                continue
+            size = os.path.getsize(key)
+            if item.get("size_bytes") is not None and size != item["size_bytes"]:
+                manifest_problems.append(f"Size mismatch: {item['path']} expected={item['size_bytes']} actual={size}")
+                continue
+            jobs.append(pool.submit(_job, item["path"], key, size, item, False, False))
+
+        for fut in jobs:
+            rel, item, sha, hit, weights, nread, err = fut.result()
+            counts["read"] += 1
+            if err is not None:
+                manifest_problems.append(err)
+            if weights is not None:
+                forbidden.append(f"{rel}  (content: {weights})")
+            counts["bytes_read"] += nread
+            if hit is not None:
+                redaction.append({"path": rel, "line": hit[1], "col": hit[2], "pattern": hit[0]})
+            if item is not None and sha is not None and sha.lower() != str(item["sha256"]).lower():
+                manifest_problems.append(f"SHA256 mismatch: {item['path']}")
+    elapsed = time.perf_counter() - t0
+
+    forbidden.sort()
+    redaction.sort(key=lambda r: r["path"])
+    ok = not forbidden and not redaction and not manifest_problems
+
+    if forbidden:
+        print("Found forbidden files (do not include these in public package):")
+        for rel in forbidden[:100]:
+            print(f"- {rel}")
+        if len(forbidden) > 100:
+            print(f"... and {len(forbidden) - 100} more")
+    if redaction:
+        print("Found potential redaction issues:")
+        for r in redaction[:200]:
+            print(f"- {r['path']}:{r['line']}:{r['col']}  (matched: {r['pattern']})")
+        if len(redaction) > 200:
+            print(f"... and {len(redaction) - 200} more")
+    for msg in manifest_problems:
+        print(msg)
+
+    if args.out:
+        # Paths in the report are relative so it can be shared without leaking local directories.
+        report = {
+            "schema_version": "0.1",
+            "ok": ok,
+            "elapsed_s": round(elapsed, 3),
+            "files_walked": counts["files"],
+            "files_read": counts["read"],
+            "bytes_read": counts["bytes_read"],
+            "forbidden": forbidden,
+            "redaction": redaction,
+            "manifest": {
+                "checked": len(expected),
+                "problems": manifest_problems,
+            }
+            if manifest_path is not None
+            else None,
+        }
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"Wrote: {out}")
+
+    print(
+        f"Audit walked {counts['files']} file(s), read {counts['read']} "
+        f"({counts['bytes_read'] / (1024 * 1024):.1f} MB) in {elapsed:.2f}s"
+    )
+    if not ok:
+        print("FAILED: public audit found problems")
+        return 2
+    print("OK: public audit passed (forbidden files, redaction, manifest)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from hashing import sha256_file
+
+
+CACHE_SCHEMA_VERSION = "0.1"
+DEFAULT_CACHE_PATH = Path(tempfile.gettempdir()) / "sw_public_bench_cache.json"
+DEFAULT_TTL_HOURS = 7 * 24
+DEFAULT_MAX_ENTRIES = 512
+
+
+def _stat_key(path: str) -> list:
+    st = os.stat(path)
+    # Same rule as the manifest hash cache: (path, size, mtime_ns, inode).
+    return [os.path.abspath(path), st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+class BenchCache:
+    """
+    Local cache of benchmark results keyed on what determines them: the llama-bench binary, the model file,
+    the run parameters and the environment fingerprint (collect_env.py). File digests are memoised on
+    (path, size, mtime_ns, inode), so a multi-GB model is hashed once, not on every sweep.
+
+    Entries older than `ttl_hours` are ignored and dropped; beyond `max_entries` the least recently used go.
+    The cache file holds local paths: keep it outside the repository (default: the system temp directory).
+    """
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_CACHE_PATH,
+        ttl_hours: float = DEFAULT_TTL_HOURS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        self.path = path
+        self.ttl_s = ttl_hours * 3600
+        self.max_entries = max_entries
+        self._results: dict[str, dict] = {}
+        self._files: dict[str, dict] = {}
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("schema_version") != CACHE_SCHEMA_VERSION:
+            return
+        if isinstance(data.get("results"), dict):
+            self._results = data["results"]
+        if isinstance(data.get("files"), dict):
+            self._files = data["files"]
+
+    def file_sha256(self, path: str) -> str | None:
+        """SHA-256 of a file via the manifest hasher, memoised on its stat key; None if it cannot be read."""
+        try:
+            key = _stat_key(path)
+        except OSError:
+            return None
+        hit = self._files.get(key[0])
+        if hit and hit.get("key") == key and isinstance(hit.get("sha256"), str):
+            return hit["sha256"]
+        try:
+            sha = sha256_file(Path(path))
+        except OSError:
+            return None
+        self._files[key[0]] = {"key": key, "sha256": sha}
+        return sha
+
+    def binary_sha256(self, exe: str) -> str | None:
+        resolved = exe if os.path.isfile(exe) else shutil.which(exe)
+        return self.file_sha256(resolved) if resolved else None
+
+    @staticmethod
+    def make_key(binary_sha: str | None, model_sha: str | None, params: dict, env_fp: str) -> str:
+        doc = {"binary": binary_sha, "model": model_sha, "params": params, "env": env_fp}
+        return hashlib.sha256(json.dumps(doc, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        entry = self._results.get(key)
+        now = time.time()
+        if entry is None or now - entry.get("stored_at", 0) > self.ttl_s or not isinstance(entry.get("row"), dict):
+            return None
+        entry["used_at"] = now
+        return entry["row"]
+
+    def put(self, key: str, row: dict) -> None:
+        now = time.time()
+        self._results[key] = {"stored_at": now, "used_at": now, "row": row}
+
+    def save(self) -> None:
+        now = time.time()
+        live = {k: e for k, e in self._results.items() if now - e.get("stored_at", 0) <= self.ttl_s}
+        if len(live) > self.max_entries:
+            keep = sorted(live, key=lambda k: live[k].get("used_at", 0), reverse=True)[: self.max_entries]
+            live = {k: live[k] for k in keep}
+        self._results = live
+        # File digests of paths that no longer exist are not worth keeping.
+        self._files = {p: e for p, e in self._files.items() if os.path.exists(p)}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"schema_version": CACHE_SCHEMA_VERSION, "results": self._results, "files": self._files}
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False, sort_keys=True) + "\n", encoding="utf-8")
+        os.replace(tmp, self.path)
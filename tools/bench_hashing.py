@@ -0,0 +1,97 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from hashing import BACKENDS, sha256_file
+
+
+def _parse_size(s: str) -> int:
+    s = s.strip().upper()
+    mult = 1
+    for suffix, m in (("G", 1024**3), ("M", 1024**2), ("K", 1024)):
+        if s.endswith(suffix):
+            s, mult = s[: -len(suffix)], m
+            break
+    return int(float(s) * mult)
+
+
+def _fmt_size(n: int) -> str:
+    for suffix, m in (("G", 1024**3), ("M", 1024**2), ("K", 1024)):
+        if n >= m and n % m == 0:
+            return f"{n // m}{suffix}"
+    return str(n)
+
+
+def _make_file(path: Path, size: int) -> None:
+    block = os.urandom(4 * 1024 * 1024)
+    with path.open("wb") as f:
+        left = size
+        while left > 0:
+            n = min(left, len(block))
+            f.write(block[:n])
+            left -= n
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Benchmark SHA-256 hashing backends and chunk sizes on synthetic files.")
+    p.add_argument("--sizes", default="1M,16M,256M", help="Comma-separated file sizes (e.g. 1M,1G,10G)")
+    p.add_argument("--chunks", default="64K,256K,1M,4M", help="Comma-separated chunk sizes")
+    p.add_argument("--backends", default=",".join(b for b in BACKENDS if b != "auto"), help="Comma-separated backends")
+    p.add_argument("--repeat", type=int, default=3, help="Repetitions per cell (best is reported)")
+    p.add_argument("--tmp-dir", default="", help="Directory for synthetic files (default: system temp)")
+    p.add_argument("--out", default="", help="Optional JSON output path")
+    args = p.parse_args()
+
+    sizes = [_parse_size(s) for s in args.sizes.split(",") if s.strip()]
+    chunks = [_parse_size(s) for s in args.chunks.split(",") if s.strip()]
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    for b in backends:
+        if b not in BACKENDS:
+            print(f"Unknown backend: {b} (choose from {', '.join(BACKENDS)})")
+            return 2
+
+    rows = []
+    with tempfile.TemporaryDirectory(dir=args.tmp_dir or None) as td:
+        for size in sizes:
+            path = Path(td) / f"bench_{_fmt_size(size)}.bin"
+            _make_file(path, size)
+            expected = None
+            for backend in backends:
+                # file_digest uses its own fixed buffer, so the chunk size does not apply.
+                for chunk in chunks if backend != "file_digest" else chunks[:1]:
+                    best = float("inf")
+                    for _ in range(max(1, args.repeat)):
+                        t0 = time.perf_counter()
+                        digest = sha256_file(path, backend=backend, chunk=chunk)
+                        best = min(best, time.perf_counter() - t0)
+                    if expected is None:
+                        expected = digest
+                    elif digest != expected:
+                        print(f"Digest mismatch: backend={backend} chunk={_fmt_size(chunk)} size={_fmt_size(size)}")
+                        return 3
+                    mb_s = (size / (1024 * 1024)) / best if best > 0 else 0.0
+                    row = {
+                        "size": _fmt_size(size),
+                        "backend": backend,
+                        "chunk": _fmt_size(chunk) if backend != "file_digest" else "n/a",
+                        "best_ms": round(best * 1000, 2),
+                        "mb_s": round(mb_s, 1),
+                    }
+                    rows.append(row)
+                    print(f"{row['size']:>6} {row['backend']:<12} chunk={row['chunk']:<5} {row['best_ms']:>10.2f}ms {row['mb_s']:>9.1f} MB/s")
+            path.unlink()
+
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        data = {"schema_version": "0.1", "repeat": args.repeat, "rows": rows}
+        out.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"Wrote: {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
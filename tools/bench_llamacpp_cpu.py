@@ -0,0 +1,557 @@
+import argparse
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+
+# Pinning prefixes the command with taskset, which sets the mask and execs it in the same process: threads the
+# child starts are pinned from the first instruction, and wait4() still reports the command's own rusage.
+TASKSET = shutil.which("taskset")
+
+
+def pinning_supported() -> bool:
+    return TASKSET is not None and hasattr(os, "sched_getaffinity")
+
+
+@dataclass
+class RunResult:
+    ms: float
+    exit_code: int
+    peak_rss_mb: float | None
+    stdout: str
+
+
+def _now() -> str:
+    return datetime.now().replace(microsecond=0).isoformat()
+
+
+def _log(path: Path | None, line: str) -> None:
+    if path is None:
+        return
+    with path.open("a", encoding="utf-8") as f:
+        f.write(f"[{_now()}] {line}\n")
+
+
+def percentile(values: list[float], p: float) -> float | None:
+    """Nearest-rank percentile, rounded to 0.1 (same rule as bench_llamacpp_cpu.ps1)."""
+    if not values:
+        return None
+    s = sorted(values)
+    idx = min(max(math.ceil(p / 100.0 * len(s)) - 1, 0), len(s) - 1)
+    return round(s[idx], 1)
+
+
+SUMMARY_PERCENTILES = (50, 90, 95, 99)
+# HDR-style buckets: each power of two is split into this many linear sub-buckets, so a bucket's upper bound
+# overstates any value in it by at most 1/HDR_SUB_BUCKETS (6.25%), over any range of magnitudes.
+HDR_SUB_BUCKETS = 16
+
+
+def summarize(values: list[float]) -> dict:
+    """n, min, p50/p90/p95/p99 (nearest rank) and max of a sample; None fields when empty."""
+    out: dict = {"n": len(values), "min": round(min(values), 1) if values else None}
+    for q in SUMMARY_PERCENTILES:
+        out[f"p{q}"] = percentile(values, q)
+    out["max"] = round(max(values), 1) if values else None
+    return out
+
+
+def hdr_histogram(values: list[float], sub_buckets: int = HDR_SUB_BUCKETS) -> list[dict]:
+    """Log-linear histogram as [{"le": upper bound, "count": n}, ...] over the non-empty buckets, ascending."""
+    counts: dict[tuple[int, int], int] = {}
+    for v in values:
+        if v <= 0:
+            key = (-1075, 0)  # below any positive float exponent
+        else:
+            m, e = math.frexp(v)  # v = m * 2**e, 0.5 <= m < 1
+            key = (e, min(int((m * 2 - 1) * sub_buckets), sub_buckets - 1))
+        counts[key] = counts.get(key, 0) + 1
+    out = []
+    for (e, sub), n in sorted(counts.items()):
+        le = 0.0 if e == -1075 else math.ldexp(1 + (sub + 1) / sub_buckets, e - 1)
+        out.append({"le": round(le, 3), "count": n})
+    return out
+
+
+def parse_llama_bench_json(stdout: str) -> dict[str, list[float]]:
+    """
+    Tokens/s samples from llama-bench `-o json` (or `-o jsonl`) output, keyed "pp" (prompt processing: n_gen == 0)
+    and "tg" (generation: n_prompt == 0). Uses per-repetition `samples_ts` when present, else `avg_ts`.
+    Unparseable output yields empty lists.
+    """
+    out: dict[str, list[float]] = {"pp": [], "tg": []}
+    text = stdout.strip()
+    try:
+        records = json.loads(text) if text else []
+    except json.JSONDecodeError:
+        records = []
+        for line in text.splitlines():
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    if isinstance(records, dict):
+        records = [records]
+    for rec in records if isinstance(records, list) else []:
+        if not isinstance(rec, dict):
+            continue
+        n_prompt, n_gen = rec.get("n_prompt") or 0, rec.get("n_gen") or 0
+        key = "tg" if n_gen and not n_prompt else "pp" if n_prompt and not n_gen else None
+        if key is None:
+            continue
+        samples = rec.get("samples_ts")
+        if not isinstance(samples, list) or not samples:
+            samples = [rec.get("avg_ts")]
+        out[key] += [round(float(v), 3) for v in samples if isinstance(v, (int, float)) and not isinstance(v, bool)]
+    return out
+
+
+def _read_vm_hwm_kb(pid: int) -> int | None:
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii", errors="ignore") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return None
+
+
+def _maxrss_to_mb(maxrss: int) -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+
+class _HwmWatcher(threading.Thread):
+    """Track /proc/<pid>/status VmHWM (kernel-maintained high-water mark) until the process exits."""
+
+    def __init__(self, pid: int, interval_s: float) -> None:
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval_s = interval_s
+        self.peak_kb = 0
+        self._done = threading.Event()
+
+    def run(self) -> None:
+        while not self._done.is_set():
+            kb = _read_vm_hwm_kb(self.pid)
+            if kb is None:
+                break
+            self.peak_kb = max(self.peak_kb, kb)
+            self._done.wait(self.interval_s)
+
+    def stop(self) -> None:
+        self._done.set()
+
+
+def run_once(cmd: list[str], hwm_interval_s: float = 0.05, cpus: set[int] | None = None) -> RunResult:
+    """
+    Run one command and measure wall time and peak RSS; `cpus` pins the child to those cores (Linux with
+    taskset only, see pinning_supported(); ValueError otherwise).
+
+    On POSIX the peak comes from wait4() rusage (exact for the child, no sampling). VmHWM from /proc is read
+    alongside as a cross-check and for children that exec helpers; the larger value wins. Elsewhere psutil is
+    used if installed, otherwise the peak is unknown.
+    """
+    if cpus:
+        if not pinning_supported():
+            raise ValueError("CPU pinning needs taskset (util-linux) on Linux")
+        # Not preexec_fn (unsafe when the caller runs threads, as the parallel sweep does), and not
+        # sched_setaffinity(pid) after Popen: threads the child starts before that call keep the full mask.
+        cmd = [TASKSET, "-c", ",".join(str(c) for c in sorted(cpus)), *cmd]
+    with tempfile.TemporaryFile() as out:
+        t0 = time.perf_counter()
+        proc = subprocess.Popen(cmd, stdout=out, stderr=subprocess.DEVNULL)
+        peak_mb: float | None = None
+        if hasattr(os, "wait4"):
+            watcher = _HwmWatcher(proc.pid, hwm_interval_s) if os.path.isdir("/proc") else None
+            if watcher is not None:
+                watcher.start()
+            _, status, rusage = os.wait4(proc.pid, 0)
+            ms = (time.perf_counter() - t0) * 1000
+            if watcher is not None:
+                watcher.stop()
+                watcher.join()
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            peak_mb = _maxrss_to_mb(rusage.ru_maxrss)
+            if watcher is not None and watcher.peak_kb:
+                peak_mb = max(peak_mb, watcher.peak_kb / 1024)
+        else:
+            peak_mb = _wait_psutil(proc, hwm_interval_s)
+            ms = (time.perf_counter() - t0) * 1000
+        out.seek(0)
+        stdout = out.read().decode("utf-8", errors="ignore")
+    return RunResult(
+        ms=round(ms, 1),
+        exit_code=int(proc.returncode),
+        peak_rss_mb=round(peak_mb, 1) if peak_mb else None,
+        stdout=stdout,
+    )
+
+
+def _wait_psutil(proc: subprocess.Popen, interval_s: float) -> float | None:
+    try:
+        import psutil  # optional, only needed where wait4 is unavailable (Windows)
+    except ImportError:
+        proc.wait()
+        return None
+    peak = 0
+    try:
+        ps = psutil.Process(proc.pid)
+        while proc.poll() is None:
+            info = ps.memory_info()
+            peak = max(peak, getattr(info, "peak_wset", 0) or info.rss)
+            time.sleep(interval_s)
+    except psutil.Error:
+        pass
+    proc.wait()
+    return peak / (1024 * 1024) if peak else None
+
+
+def _drift_pct(first: float, last: float) -> float | None:
+    return round((last - first) / first * 100.0, 1) if first > 0 else None
+
+
+def soak(
+    cmd: list[str],
+    minutes: float,
+    workers: int = 1,
+    mem_budget_mb: float = 0.0,
+    window_s: float = 60.0,
+    log_path: Path | None = None,
+    progress: Path | None = None,
+) -> dict:
+    """
+    Keep `workers` copies of `cmd` running back to back until `minutes` elapse, then aggregate.
+
+    A new run is admitted only while (running + 1) x the largest peak RSS seen so far fits in `mem_budget_mb`
+    (0 = no memory budget); with a budget, runs stay serial until a peak RSS has been measured. Every finished
+    run is appended to `log_path` as one JSON line, so a long soak can be followed live and survives an
+    interrupted harness. Throughput is counted per `window_s` window; drift compares the first and last full
+    windows.
+    """
+    start = time.monotonic()
+    deadline = start + minutes * 60
+    cond = threading.Condition()
+    state = {"running": 0, "max_peak": 0.0, "runs": 0, "crashes": 0, "last_beat": start}
+    records: list[tuple[float, float, int]] = []  # (finish offset s, ms, exit code)
+    log_f = log_path.open("a", encoding="utf-8") if log_path is not None else None
+
+    def _admit() -> bool:
+        with cond:
+            while True:
+                if time.monotonic() >= deadline:
+                    return False
+                # Until a run has reported its peak RSS the footprint is unknown: run one at a time.
+                peak = state["max_peak"]
+                fits = peak > 0 and (state["running"] + 1) * peak <= mem_budget_mb
+                if not mem_budget_mb or state["running"] == 0 or fits:
+                    state["running"] += 1
+                    return True
+                cond.wait(timeout=max(0.0, deadline - time.monotonic()))
+
+    def _worker(wid: int) -> None:
+        while _admit():
+            r = run_once(cmd)
+            now = time.monotonic()
+            with cond:
+                state["running"] -= 1
+                state["runs"] += 1
+                if r.exit_code != 0:
+                    state["crashes"] += 1
+                if r.peak_rss_mb:
+                    state["max_peak"] = max(state["max_peak"], r.peak_rss_mb)
+                records.append((now - start, r.ms, r.exit_code))
+                if log_f is not None:
+                    rec = {"t_s": round(now - start, 3), "worker": wid, "ms": r.ms, "exit": r.exit_code, "peak_rss_mb": r.peak_rss_mb}
+                    log_f.write(json.dumps(rec) + "\n")
+                    log_f.flush()
+                if now - state["last_beat"] >= 60:
+                    _log(
+                        progress,
+                        f"heartbeat elapsed_min={int((now - start) // 60)} long_runs={state['runs']} "
+                        f"crash_count={state['crashes']} running={state['running']}",
+                    )
+                    state["last_beat"] = now
+                cond.notify_all()
+
+    threads = [threading.Thread(target=_worker, args=(i,), daemon=True) for i in range(max(1, workers))]
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        if log_f is not None:
+            log_f.close()
+
+    elapsed_s = time.monotonic() - start
+    n_windows = int(elapsed_s // window_s) if window_s > 0 else 0
+    series = []
+    for w in range(n_windows):
+        lo, hi = w * window_s, (w + 1) * window_s
+        in_w = [ms for t, ms, _ in records if lo <= t < hi]
+        series.append(
+            {
+                "t_start_s": round(lo, 1),
+                "runs_per_min": round(len(in_w) * 60.0 / window_s, 2),
+                "latency_ms_p50": percentile(in_w, 50),
+            }
+        )
+    out = {
+        "long_run_minutes": round(elapsed_s / 60.0, 2),
+        "crash_count": state["crashes"],
+        "runs": state["runs"],
+        "workers": max(1, workers),
+        "latency_ms_p50": percentile([ms for _, ms, _ in records], 50),
+        "latency_ms_p95": percentile([ms for _, ms, _ in records], 95),
+        "throughput_series": series,
+        "throughput_drift_pct": None,
+        "latency_drift_pct": None,
+    }
+    if len(series) >= 2:
+        out["throughput_drift_pct"] = _drift_pct(series[0]["runs_per_min"], series[-1]["runs_per_min"])
+        if series[0]["latency_ms_p50"] and series[-1]["latency_ms_p50"]:
+            out["latency_drift_pct"] = _drift_pct(series[0]["latency_ms_p50"], series[-1]["latency_ms_p50"])
+    return out
+
+
+def evict_page_cache(path: str) -> bool:
+    """
+    Ask the kernel to drop a file's cached pages (posix_fadvise DONTNEED), so the next read comes from storage.
+
+    Returns False where this is unavailable (Windows, macOS) or refused. Pages still mapped by another process or
+    dirty pages are not dropped, so this is best effort; it needs no privileges, unlike drop_caches.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return False
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        return True
+    except OSError:
+        return False
+    finally:
+        os.close(fd)
+
+
+def run_series(
+    cmd: list[str], runs: int, cold_files: list[str], progress: Path | None, label: str
+) -> tuple[list[RunResult], bool]:
+    """
+    Run `cmd` `runs` times. With `cold_files`, each run is preceded by evicting those files from the page cache
+    (cold start); otherwise one unrecorded warm-up run fills the cache first (warm start). Returns the runs and
+    whether every eviction was accepted.
+    """
+    evicted = bool(cold_files)
+    if not cold_files:
+        run_once(cmd)
+    results = []
+    for i in range(1, runs + 1):
+        for path in cold_files:
+            evicted = evict_page_cache(path) and evicted
+        r = run_once(cmd)
+        results.append(r)
+        print(f"{label} run#{i}: {r.ms}ms exit={r.exit_code} peak_rss_mb={r.peak_rss_mb}")
+        _log(progress, f"{label}_run {i}/{runs} ms={r.ms} exit={r.exit_code} peak_rss_mb={r.peak_rss_mb}")
+    return results, evicted
+
+
+def llama_bench_cmd(
+    llama_bench: str,
+    model: str,
+    prompt_tokens: int,
+    gen_tokens: int,
+    load_mode: str = "mmap",
+    threads: int = 0,
+    batch: int = 0,
+    ubatch: int = 0,
+) -> list[str]:
+    """llama-bench command line for one repetition; threads/batch/ubatch of 0 keep llama-bench's defaults."""
+    cmd = [
+        llama_bench, "-m", model, "-o", "json", "-r", "1", "-p", str(prompt_tokens), "-n", str(gen_tokens),
+        "-mmp", "1" if load_mode == "mmap" else "0", "--no-warmup",
+    ]
+    for flag, v in (("-t", threads), ("-b", batch), ("-ub", ubatch)):
+        if v:
+            cmd += [flag, str(v)]
+    return cmd
+
+
+def _series_summary(runs: list[RunResult] | None) -> dict | None:
+    if runs is None:
+        return None
+    ms = [r.ms for r in runs]
+    return {**summarize(ms), "histogram": hdr_histogram(ms), "samples": ms}
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(
+        description=(
+            "Benchmark llama-bench (or any command): load time and tokens/s distributions, exact peak RSS, "
+            "long-run stability."
+        )
+    )
+    p.add_argument("--llama-bench", default="", help="Path to llama-bench")
+    p.add_argument("--model", default="", help="Path to the GGUF model")
+    p.add_argument("--out", default=str(Path(tempfile.gettempdir()) / "sw_public_bench.json"), help="bench.json output")
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument("--prompt-tokens", type=int, default=8)
+    p.add_argument("--gen-tokens", type=int, default=1)
+    p.add_argument("--long-run-minutes", type=float, default=30)
+    p.add_argument(
+        "--series",
+        choices=["both", "cold", "warm"],
+        default="both",
+        help="cold: evict the model from the page cache before every run; warm: one warm-up run, then measure",
+    )
+    p.add_argument("--threads", type=int, default=0, help="llama-bench -t (0 = its default)")
+    p.add_argument("--batch-size", type=int, default=0, help="llama-bench -b (0 = its default)")
+    p.add_argument("--ubatch-size", type=int, default=0, help="llama-bench -ub (0 = its default)")
+    p.add_argument("--load-mode", choices=["mmap", "read"], default="mmap", help="llama-bench model loading (-mmp 1/0)")
+    p.add_argument(
+        "--evict",
+        action="append",
+        default=[],
+        help="File to evict before each cold run (repeatable; default: --model)",
+    )
+    p.add_argument("--progress-log", default=str(Path("_logs") / "bench_progress.log"))
+    p.add_argument("--soak-workers", type=int, default=1, help="Parallel processes during the long run")
+    p.add_argument("--soak-mem-budget-mb", type=float, default=0.0, help="Cap on summed peak RSS of running workers (0 = none)")
+    p.add_argument("--soak-window-s", type=float, default=60.0, help="Window for throughput-over-time drift")
+    p.add_argument("--soak-log", default=str(Path("_logs") / "soak_runs.jsonl"), help="Per-run JSONL log of the long run")
+    p.add_argument("cmd", nargs=argparse.REMAINDER, help="Alternative to --llama-bench: '-- <command> [args...]'")
+    args = p.parse_args()
+
+    cmd = [c for c in args.cmd if c != "--"] if args.cmd else []
+    if not cmd:
+        if not args.llama_bench or not args.model:
+            p.error("give --llama-bench and --model, or a command after '--'")
+        if not Path(args.llama_bench).is_file():
+            print(f"llama-bench not found: {args.llama_bench}")
+            return 2
+        if not Path(args.model).is_file():
+            print(f"GGUF model not found: {args.model}")
+            return 2
+        tuning = {"threads": args.threads, "batch": args.batch_size, "ubatch": args.ubatch_size}
+        cmd = llama_bench_cmd(
+            args.llama_bench, args.model, args.prompt_tokens, args.gen_tokens, args.load_mode, **tuning
+        )
+        long_cmd = llama_bench_cmd(args.llama_bench, args.model, 1, 1, args.load_mode, **tuning)
+    else:
+        long_cmd = cmd
+    cold_files = args.evict or ([args.model] if args.model else [])
+
+    progress = Path(args.progress_log) if args.progress_log else None
+    if progress is not None:
+        progress.parent.mkdir(parents=True, exist_ok=True)
+    _log(progress, f"START runs={args.runs} long_run_minutes={args.long_run_minutes}")
+
+    print("== bench llama.cpp (CPU) ==")
+    print(f"command:  {cmd[0]}")
+    print(f"out_json: {args.out}")
+    print("NOTE: out_json contains local absolute paths; do NOT place it under the repo or commit it.")
+
+    series: dict[str, list[RunResult]] = {}
+    cold_evicted = False
+    if args.series in ("both", "cold"):
+        if not cold_files:
+            print("WARNING: no file to evict (give --model or --evict); cold series runs with whatever is cached")
+        series["cold"], cold_evicted = run_series(cmd, args.runs, cold_files, progress, "cold")
+        if cold_files and not cold_evicted:
+            print("WARNING: page-cache eviction unavailable or refused; cold series may be partly warm")
+    if args.series in ("both", "warm"):
+        series["warm"], _ = run_series(cmd, args.runs, [], progress, "warm")
+
+    # load_time_ms keeps its cold-start meaning (MEASURE.md) unless only the warm series was run.
+    primary = series["cold"] if "cold" in series else series["warm"]
+    times = [r.ms for r in primary]
+    peaks = [r.peak_rss_mb for rs in series.values() for r in rs if r.peak_rss_mb is not None]
+    # Tokens/s is a steady-state figure: taken from the warm series when there is one.
+    tokens_per_s: dict[str, list[float]] = {"pp": [], "tg": []}
+    for r in series.get("warm", primary):
+        if r.exit_code == 0:
+            for key, samples in parse_llama_bench_json(r.stdout).items():
+                tokens_per_s[key] += samples
+
+    # Long-run stability: keep --soak-workers short runs going until the time budget is spent.
+    soak_log = Path(args.soak_log) if args.soak_log else None
+    if soak_log is not None:
+        soak_log.parent.mkdir(parents=True, exist_ok=True)
+    workers = max(1, min(args.soak_workers, os.cpu_count() or 1))
+    stability = soak(
+        long_cmd,
+        args.long_run_minutes,
+        workers=workers,
+        mem_budget_mb=args.soak_mem_budget_mb,
+        window_s=args.soak_window_s,
+        log_path=soak_log,
+        progress=progress,
+    )
+    print(
+        f"long run: {stability['runs']} runs on {workers} worker(s), crash_count={stability['crash_count']}, "
+        f"throughput_drift_pct={stability['throughput_drift_pct']}"
+    )
+
+    out = {
+        "schema_version": "1.0",
+        "method": "llama.cpp-bench-cpu",
+        "runs": args.runs,
+        "series": args.series,
+        "prompt_tokens": args.prompt_tokens,
+        "gen_tokens": args.gen_tokens,
+        "threads": args.threads or None,
+        "batch_size": args.batch_size or None,
+        "ubatch_size": args.ubatch_size or None,
+        "metrics": {
+            "load_time_ms_p50": percentile(times, 50),
+            "load_time_ms_p95": percentile(times, 95),
+            "peak_rss_mb": round(max(peaks), 1) if peaks else None,
+            "peak_rss_mb_samples": peaks,
+            "load_mode": args.load_mode if not args.cmd else "unknown",
+            "cold_cache_evicted": cold_evicted if "cold" in series else None,
+            # Full distributions; raw samples are kept so runs can be compared statistically later.
+            "load_time_ms": {**summarize(times), "histogram": hdr_histogram(times), "samples": times},
+            "load_time_ms_cold": _series_summary(series.get("cold")),
+            "load_time_ms_warm": _series_summary(series.get("warm")),
+            "pp_tokens_per_s": {**summarize(tokens_per_s["pp"]), "samples": tokens_per_s["pp"]},
+            "tg_tokens_per_s": {**summarize(tokens_per_s["tg"]), "samples": tokens_per_s["tg"]},
+            "stability": {
+                # long_run_minutes is the measured soak time (it overruns by the last runs, or stops early
+                # if the harness is interrupted); the requested budget is kept alongside.
+                **stability,
+                "long_run_minutes_requested": args.long_run_minutes,
+                "notes": (
+                    f"CPU soak of llama-bench invocations on {workers} parallel worker(s); "
+                    "crash_count counts non-zero exit codes"
+                ),
+            },
+        },
+        "inputs": {
+            "llama_bench": args.llama_bench or cmd[0],
+            "model_gguf": args.model,
+        },
+    }
+
+    out_path = Path(args.out)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(out, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    print(f"Wrote bench json: {out_path}")
+    _log(progress, f"END wrote={out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
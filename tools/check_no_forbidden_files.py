@@ -1,6 +1,11 @@
 import argparse
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from make_manifest import iter_files
+
 
 FORBIDDEN_SUFFIXES = {
     ".safetensors",
@@ -11,25 +16,86 @@ FORBIDDEN_SUFFIXES = {
     ".onnx",
 }
 
+# Files smaller than this are not sniffed: real weight payloads are far larger, and skipping tiny files keeps
+# the scan to one stat per file on trees with tens of thousands of traces.
+SNIFF_MIN_SIZE = 1024 * 1024
+SNIFF_BYTES = 512
+
+# Legacy (non-zip) torch.save: pickle protocol 2 + LONG1 of the magic number 0x1950a86a20f9469cfc6c.
+_TORCH_LEGACY_MAGIC = b"\x80\x02\x8a\x0a\x6c\xfc\x9c\x46\xf9\x20\x6a\xa8\x50\x19"
+_TORCH_ZIP_MEMBERS = ("data.pkl", ".format_version", "byteorder", "version")
+# ONNX ModelProto starts with ir_version (field 1, varint) followed by another top-level field.
+_ONNX_NEXT_TAGS = {0x12, 0x1A, 0x22, 0x2A, 0x32, 0x3A, 0x42, 0x72, 0x82}
+
+
+def sniff_header(head: bytes, size: int) -> str | None:
+    """Classify a weight-like payload from its first bytes; returns a format name or None."""
+    if head[:4] == b"GGUF":
+        return "gguf"
+    if len(head) >= 10:
+        (header_len,) = struct.unpack_from("<Q", head, 0)
+        if 2 <= header_len <= size - 8 and head[8:10] in (b'{"', b"{ ", b"{}"):
+            return "safetensors"
+    if head[:4] == b"PK\x03\x04" and len(head) >= 30:
+        (name_len,) = struct.unpack_from("<H", head, 26)
+        name = head[30 : 30 + name_len].decode("utf-8", errors="ignore")
+        if name.endswith(_TORCH_ZIP_MEMBERS) and "/" in name:
+            return "pytorch-zip"
+    if head.startswith(_TORCH_LEGACY_MAGIC):
+        return "pytorch-legacy"
+    if len(head) >= 3 and head[0] == 0x08 and 1 <= head[1] <= 30 and head[2] in _ONNX_NEXT_TAGS:
+        if b"onnx" in head.lower() or b"pytorch" in head.lower() or b"tf2onnx" in head.lower():
+            return "onnx"
+    return None
+
+
+def sniff_file(path: str, size: int) -> str | None:
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    except OSError:
+        return None
+    try:
+        head = os.read(fd, SNIFF_BYTES)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+    return sniff_header(head, size)
+
 
 def main() -> int:
     p = argparse.ArgumentParser(description="Scan for forbidden weight/data files in public directory.")
     p.add_argument("--root", default=".", help="Root directory to scan")
+    p.add_argument(
+        "--min-sniff-size",
+        type=int,
+        default=SNIFF_MIN_SIZE,
+        help="Only sniff file headers (GGUF/safetensors/ONNX/PyTorch) for files at least this many bytes",
+    )
+    p.add_argument("--no-sniff", action="store_true", help="Suffix check only")
+    p.add_argument("--jobs", type=int, default=8, help="Parallel header readers")
     args = p.parse_args()
 
     root = Path(args.root).resolve()
-    bad: list[Path] = []
+    bad: list[tuple[str, str]] = []
+    candidates: list[tuple[str, int]] = []
+
+    for rel, fs_path, st in iter_files(root, recursive=True):
+        suffix = os.path.splitext(rel)[1].lower()
+        if suffix in FORBIDDEN_SUFFIXES:
+            bad.append((fs_path, f"suffix {suffix}"))
+        elif not args.no_sniff and st.st_size >= args.min_sniff_size:
+            candidates.append((fs_path, st.st_size))
 
-    for path in root.rglob("*"):
-        if not path.is_file():
-            continue
-        if path.suffix.lower() in FORBIDDEN_SUFFIXES:
-            bad.append(path)
+    if candidates:
+        with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+            kinds = list(pool.map(lambda c: sniff_file(*c), candidates))
+        bad += [(pth, f"content: {kind}") for (pth, _), kind in zip(candidates, kinds) if kind]
 
     if bad:
         print("Found forbidden files (do not include these in public package):")
-        for f in bad[:100]:
-            print(f"- {f}")
+        for f, why in bad[:100]:
+            print(f"- {f}  ({why})")
         if len(bad) > 100:
             print(f"... and {len(bad) - 100} more")
         return 2
@@ -40,5 +106,3 @@ def main() -> int:
 
 if __name__ == "__main__":
     raise SystemExit(main())
-
-
@@ -1,24 +1,186 @@
 import argparse
+import functools
+import hashlib
 import json
+import os
 import platform
 import sys
 from datetime import datetime, timezone
 from pathlib import Path
 
 
+# ISA extensions that change inference kernels (llama.cpp / oneDNN dispatch), by /proc/cpuinfo flag name.
+ISA_FLAGS = [
+    "sse4_2",
+    "avx",
+    "avx2",
+    "fma",
+    "f16c",
+    "avx512f",
+    "avx512bw",
+    "avx512vl",
+    "avx512_vnni",
+    "avx512_bf16",
+    "avx_vnni",
+    "amx_tile",
+    "amx_int8",
+    "amx_bf16",
+    # aarch64 names
+    "asimd",
+    "asimddp",
+    "sve",
+    "sve2",
+    "i8mm",
+    "bf16",
+]
+_SYS_CPU = Path("/sys/devices/system/cpu")
+
+
 def _now_utc() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
 
 
-def main() -> int:
-    p = argparse.ArgumentParser(description="Collect minimal environment info for public evidence pack.")
-    p.add_argument("--out", required=True, help="Output path for env.json")
-    args = p.parse_args()
+def _read(path: Path | str) -> str | None:
+    try:
+        with open(path, encoding="ascii", errors="ignore") as f:
+            return f.read().strip()
+    except OSError:
+        return None
 
-    out = Path(args.out)
-    out.parent.mkdir(parents=True, exist_ok=True)
 
-    data = {
+def _cpulist_len(spec: str) -> int:
+    n = 0
+    for part in spec.split(","):
+        if "-" in part:
+            a, b = part.split("-")
+            n += int(b) - int(a) + 1
+        elif part:
+            n += 1
+    return n
+
+
+def _cpuinfo() -> dict:
+    text = _read("/proc/cpuinfo") or ""
+    model, flags, logical, cores = None, set(), 0, set()
+    phys = core = None
+    for line in text.splitlines():
+        key, _, value = line.partition(":")
+        key, value = key.strip(), value.strip()
+        if key == "processor":
+            logical += 1
+        elif key in ("model name", "Processor", "cpu model") and model is None:
+            model = value
+        elif key in ("flags", "Features") and not flags:
+            flags = set(value.split())
+        elif key == "physical id":
+            phys = value
+        elif key == "core id":
+            core = value
+        elif not line.strip() and core is not None:
+            cores.add((phys, core))
+            phys = core = None
+    if core is not None:
+        cores.add((phys, core))
+    return {"model": model, "flags": flags, "logical": logical, "physical": len(cores) or None}
+
+
+def _caches() -> dict:
+    """Per-core view from cpu0: {"L1d_kb": 48, "L1i_kb": 32, "L2_kb": 2048, "L3_kb": 30720}."""
+    out = {}
+    for index in sorted((_SYS_CPU / "cpu0" / "cache").glob("index*")):
+        level, kind, size = (_read(index / name) for name in ("level", "type", "size"))
+        if not level or not size:
+            continue
+        suffix = {"Data": "d", "Instruction": "i"}.get(kind or "", "")
+        kb = int(size[:-1]) * (1024 if size.endswith("M") else 1) if size[-1] in "KM" else int(size) // 1024
+        out[f"L{level}{suffix}_kb"] = kb
+    return out
+
+
+def _numa() -> list[dict]:
+    nodes = []
+    for node in sorted(Path("/sys/devices/system/node").glob("node[0-9]*"), key=lambda p: int(p.name[4:])):
+        cpus = _read(node / "cpulist") or ""
+        mem_kb = 0
+        for line in (_read(node / "meminfo") or "").splitlines():
+            if "MemTotal:" in line:
+                mem_kb = int(line.split()[-2])
+        nodes.append({"node": int(node.name[4:]), "cpus": _cpulist_len(cpus), "mem_gb": round(mem_kb / 1024**2, 1)})
+    return nodes
+
+
+def _ram_bytes() -> int | None:
+    if hasattr(os, "sysconf"):
+        try:
+            return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+        except (ValueError, OSError):
+            pass
+    if sys.platform == "win32":
+        import ctypes
+
+        class _MemStatus(ctypes.Structure):
+            _fields_ = [("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong)] + [
+                (name, ctypes.c_ulonglong)
+                for name in ("total", "avail", "pagefile", "availpage", "virtual", "availvirtual", "extended")
+            ]
+
+        st = _MemStatus()
+        st.dwLength = ctypes.sizeof(_MemStatus)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(st)):
+            return int(st.total)
+    return None
+
+
+def _selected(text: str | None) -> str | None:
+    # "always [madvise] never" -> "madvise"
+    if text and "[" in text:
+        return text[text.index("[") + 1 : text.index("]")]
+    return text
+
+
+@functools.lru_cache(maxsize=1)
+def hardware() -> dict:
+    """
+    CPU model, core/thread counts, caches, ISA flags, NUMA nodes, RAM, governor, THP and kernel mitigations.
+
+    Read straight from /proc and /sys (no subprocesses), so it takes a few milliseconds; cached per process.
+    Fields that the platform does not expose are null.
+    """
+    info = _cpuinfo()
+    ram = _ram_bytes()
+    vulns = {}
+    vdir = _SYS_CPU / "vulnerabilities"
+    if vdir.is_dir():
+        for f in sorted(vdir.iterdir()):
+            status = _read(f) or ""
+            # Keep the verdict only ("Mitigation", "Not affected", "Vulnerable"), not microcode details.
+            vulns[f.name] = status.split(":")[0].split(";")[0].strip()
+    return {
+        "cpu_model": info["model"] or platform.processor() or None,
+        "physical_cores": info["physical"],
+        "logical_cpus": info["logical"] or os.cpu_count(),
+        "caches": _caches(),
+        "isa": [flag for flag in ISA_FLAGS if flag in info["flags"]],
+        "numa_nodes": _numa(),
+        "ram_gb": round(ram / 1024**3, 1) if ram else None,
+        "cpu_governor": _read(_SYS_CPU / "cpu0" / "cpufreq" / "scaling_governor"),
+        "thp": _selected(_read("/sys/kernel/mm/transparent_hugepage/enabled")),
+        "mitigations": vulns,
+    }
+
+
+def device_info() -> dict:
+    """The results.json `device` block (strings, as the schema requires)."""
+    hw = hardware()
+    return {
+        "os": platform.platform(),
+        "cpu": hw["cpu_model"] or "unknown",
+        "ram_gb": str(hw["ram_gb"]) if hw["ram_gb"] is not None else "unknown",
+    }
+
+
+def collect_env() -> dict:
+    return {
         "schema_version": "0.1",
         "generated_at_utc": _now_utc(),
         "python": sys.version.split()[0],
@@ -29,9 +191,27 @@ def main() -> int:
             "machine": platform.machine(),
             "processor": platform.processor(),
         },
+        "hardware": hardware(),
         "notes": "Minimal environment info only. Do not include any local paths, usernames, or sensitive markers.",
     }
 
+
+def env_fingerprint(env: dict | None = None) -> str:
+    """SHA-256 over the environment fields (timestamp excluded): equal fingerprints mean comparable machines."""
+    env = dict(env if env is not None else collect_env())
+    env.pop("generated_at_utc", None)
+    return hashlib.sha256(json.dumps(env, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Collect minimal environment info for public evidence pack.")
+    p.add_argument("--out", required=True, help="Output path for env.json")
+    args = p.parse_args()
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+
+    data = collect_env()
     out.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
     print(f"Wrote: {out}")
     return 0
@@ -39,5 +219,3 @@ def main() -> int:
 
 if __name__ == "__main__":
     raise SystemExit(main())
-
-
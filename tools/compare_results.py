@@ -0,0 +1,253 @@
+import argparse
+import json
+import math
+import random
+from pathlib import Path
+
+
+# (metric, direction): +1 = higher is better, -1 = lower is better. Samples are read from "<metric>_samples";
+# without them only the point value "<point>" is compared, which is reported but never gates.
+METRICS = [
+    ("load_time_ms", -1, "load_time_ms_p50"),
+    ("load_time_ms_warm", -1, "load_time_ms_warm_p50"),
+    ("tg_tokens_per_s", +1, "tg_tokens_per_s_p50"),
+    ("pp_tokens_per_s", +1, "pp_tokens_per_s_p50"),
+    ("peak_memory_mb", -1, "peak_memory_mb"),
+]
+
+# Exact Mann-Whitney null distribution up to this many samples per side (and no ties); normal approximation above.
+EXACT_MAX_N = 20
+
+
+def _load_results(path: Path) -> dict:
+    if path.is_dir():
+        path = path / "results.json"
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _median(values: list[float]) -> float:
+    s = sorted(values)
+    mid = len(s) // 2
+    return s[mid] if len(s) % 2 else (s[mid - 1] + s[mid]) / 2
+
+
+def _ranks(values: list[float]) -> tuple[list[float], list[int]]:
+    """Average ranks (1-based) and the sizes of tie groups."""
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    ties = []
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2 + 1
+        if j > i:
+            ties.append(j - i + 1)
+        i = j + 1
+    return ranks, ties
+
+
+def _exact_u_cdf(n1: int, n2: int) -> list[float]:
+    """P(U <= u) for u = 0..n1*n2 under H0, by the standard counting recurrence."""
+    # counts[i][j][u]: arrangements of i x-values and j y-values with U = u.
+    prev = [[1] + [0] * (n1 * n2) for _ in range(n2 + 1)]  # i = 0
+    for i in range(1, n1 + 1):
+        cur = [[0] * (n1 * n2 + 1) for _ in range(n2 + 1)]
+        cur[0][0] = 1
+        for j in range(1, n2 + 1):
+            a, b = prev[j], cur[j - 1]
+            row = cur[j]
+            for u in range(i * j + 1):
+                row[u] = (a[u - j] if u >= j else 0) + b[u]
+        prev = cur
+    counts = prev[n2]
+    total = math.comb(n1 + n2, n1)
+    out, acc = [], 0
+    for c in counts:
+        acc += c
+        out.append(acc / total)
+    return out
+
+
+def mann_whitney_p(x: list[float], y: list[float]) -> float:
+    """Two-sided Mann-Whitney U p-value (exact for small samples without ties, else normal with tie correction)."""
+    n1, n2 = len(x), len(y)
+    if not n1 or not n2:
+        return 1.0
+    ranks, ties = _ranks(list(x) + list(y))
+    u1 = sum(ranks[:n1]) - n1 * (n1 + 1) / 2
+    u = min(u1, n1 * n2 - u1)
+    if not ties and max(n1, n2) <= EXACT_MAX_N:
+        return min(1.0, 2 * _exact_u_cdf(n1, n2)[int(u)])
+    n = n1 + n2
+    var = n1 * n2 / 12 * ((n + 1) - sum(t**3 - t for t in ties) / (n * (n - 1)))
+    if var <= 0:
+        return 1.0
+    z = (n1 * n2 / 2 - u - 0.5) / math.sqrt(var)
+    return min(1.0, math.erfc(max(z, 0.0) / math.sqrt(2)))
+
+
+def bootstrap_ci(
+    x: list[float], y: list[float], iterations: int = 2000, confidence: float = 0.95, seed: int = 0
+) -> tuple[float, float] | None:
+    """Percentile bootstrap CI of the relative change of the median, (median(y) - median(x)) / median(x) in %."""
+    if not x or not y:
+        return None
+    rng = random.Random(seed)
+    deltas = []
+    for _ in range(iterations):
+        mx = _median(rng.choices(x, k=len(x)))
+        my = _median(rng.choices(y, k=len(y)))
+        if mx:
+            deltas.append((my - mx) / mx * 100.0)
+    if not deltas:
+        return None
+    deltas.sort()
+    lo = deltas[int((1 - confidence) / 2 * (len(deltas) - 1))]
+    hi = deltas[int((1 + confidence) / 2 * (len(deltas) - 1))]
+    return lo, hi
+
+
+def _samples(metrics: dict, name: str) -> list[float]:
+    v = metrics.get(f"{name}_samples")
+    if not isinstance(v, list):
+        return []
+    return [float(x) for x in v if isinstance(x, (int, float)) and not isinstance(x, bool)]
+
+
+def _point(metrics: dict, key: str) -> float | None:
+    v = metrics.get(key)
+    return float(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else None
+
+
+def compare(
+    baseline: dict,
+    candidate: dict,
+    threshold_pct: float = 5.0,
+    alpha: float = 0.05,
+    iterations: int = 2000,
+    seed: int = 0,
+) -> list[dict]:
+    """
+    One row per metric present in both results. A row is a regression when the median moved in the worse
+    direction by more than `threshold_pct` and the Mann-Whitney p-value is below `alpha`.
+    """
+    bm, cm = baseline.get("metrics") or {}, candidate.get("metrics") or {}
+    rows = []
+    for name, direction, point in METRICS:
+        xs, ys = _samples(bm, name), _samples(cm, name)
+        if xs and ys:
+            b, c = _median(xs), _median(ys)
+        else:
+            b, c = _point(bm, point), _point(cm, point)
+            xs = ys = []
+        if b is None or c is None:
+            continue
+        delta = (c - b) / b * 100.0 if b else None
+        row = {
+            "metric": name,
+            "better": "higher" if direction > 0 else "lower",
+            "baseline": round(b, 3),
+            "candidate": round(c, 3),
+            "delta_pct": round(delta, 2) if delta is not None else None,
+            "n": [len(xs), len(ys)],
+            "ci_pct": None,
+            "p_value": None,
+            "verdict": "no samples",
+        }
+        if xs and ys and delta is not None:
+            ci = bootstrap_ci(xs, ys, iterations, seed=seed)
+            p = mann_whitney_p(xs, ys)
+            row["ci_pct"] = [round(ci[0], 2), round(ci[1], 2)] if ci else None
+            row["p_value"] = round(p, 4)
+            worse = -direction * delta
+            if p >= alpha:
+                row["verdict"] = "no significant change"
+            elif worse > threshold_pct:
+                row["verdict"] = "REGRESSION"
+            elif worse < 0:
+                row["verdict"] = "improvement"
+            else:
+                row["verdict"] = "within threshold"
+        rows.append(row)
+    return rows
+
+
+def _fmt(v, suffix: str = "") -> str:
+    return "-" if v is None else f"{v:g}{suffix}"
+
+
+def to_markdown(rows: list[dict], threshold_pct: float, alpha: float) -> str:
+    lines = [
+        "## Baseline vs candidate",
+        "",
+        f"Medians of per-run samples; 95% bootstrap CI of the median change; two-sided Mann-Whitney U. "
+        f"Regression = worse by more than {threshold_pct:g}% with p < {alpha:g}.",
+        "",
+        "| metric | better | baseline | candidate | Δ | 95% CI | p | n | verdict |",
+        "|---|---|---:|---:|---:|---:|---:|---:|---|",
+    ]
+    for r in rows:
+        ci = f"[{r['ci_pct'][0]:+g}%, {r['ci_pct'][1]:+g}%]" if r["ci_pct"] else "-"
+        delta = "-" if r["delta_pct"] is None else f"{r['delta_pct']:+g}%"
+        lines.append(
+            f"| {r['metric']} | {r['better']} | {_fmt(r['baseline'])} | {_fmt(r['candidate'])} | {delta} | {ci} "
+            f"| {_fmt(r['p_value'])} | {r['n'][0]}/{r['n'][1]} | {r['verdict']} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Statistically compare two results.json files (baseline vs candidate).")
+    p.add_argument("--baseline", required=True, help="Baseline results.json or artifacts directory")
+    p.add_argument("--candidate", required=True, help="Candidate results.json or artifacts directory")
+    p.add_argument("--threshold-pct", type=float, default=5.0, help="Regression threshold on the median change")
+    p.add_argument("--alpha", type=float, default=0.05, help="Significance level")
+    p.add_argument("--bootstrap", type=int, default=2000, help="Bootstrap resamples for the CI")
+    p.add_argument("--seed", type=int, default=0, help="Bootstrap seed (fixed for reproducible reports)")
+    p.add_argument("--md", default="", help="Write the markdown diff to this path (e.g. for report.md)")
+    p.add_argument("--json", default="", help="Write the comparison rows as JSON to this path")
+    args = p.parse_args()
+
+    docs = {}
+    for label, path in (("baseline", Path(args.baseline)), ("candidate", Path(args.candidate))):
+        try:
+            docs[label] = _load_results(path)
+        except FileNotFoundError:
+            print(f"{label} results.json not found: {path}")
+            return 2
+        except (OSError, ValueError) as e:
+            print(f"Invalid {label} results.json: {e}")
+            return 3
+
+    rows = compare(docs["baseline"], docs["candidate"], args.threshold_pct, args.alpha, args.bootstrap, args.seed)
+    if not rows:
+        print("No comparable metrics in baseline and candidate")
+        return 3
+    md = to_markdown(rows, args.threshold_pct, args.alpha)
+    print(md, end="")
+
+    if args.md:
+        out = Path(args.md)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(md, encoding="utf-8")
+        print(f"Wrote: {out}")
+    if args.json:
+        out = Path(args.json)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        data = {"schema_version": "0.1", "threshold_pct": args.threshold_pct, "alpha": args.alpha, "metrics": rows}
+        out.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"Wrote: {out}")
+
+    regressions = [r["metric"] for r in rows if r["verdict"] == "REGRESSION"]
+    if regressions:
+        print(f"FAILED: significant regression in {', '.join(regressions)}")
+        return 4
+    print("OK: no significant regression")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
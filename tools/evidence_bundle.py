@@ -0,0 +1,496 @@
+"""
+Content-addressed evidence bundle: many packs in one zip, each distinct file stored once.
+
+Layout (a plain zip, readable with any unzip tool):
+- blobs/<sha[:2]>/<sha256>   file contents, compressed, one member per distinct SHA-256
+- packs/<name>.json          {"schema_version", "name", "created_at_utc", "files": [{path, size_bytes, sha256}]}
+
+Adding a pack appends only its index and the blobs the bundle does not have yet, so archiving a nightly pack
+whose env/report/weights-free evidence mostly repeats costs little. Digests are taken from the pack's
+manifest.json when it is newer than the file and the size matches, so unchanged files already in the bundle
+are not read at all. Reading goes through the zip central directory: listing a bundle or extracting one
+artifact decompresses only that member.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import struct
+import sys
+import zipfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO
+
+from hashing import sha256_file
+from make_manifest import iter_files
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+BUNDLE_SCHEMA_VERSION = "0.1"
+BLOB_PREFIX = "blobs/"
+PACK_PREFIX = "packs/"
+COMPRESSION = {"deflate": zipfile.ZIP_DEFLATED, "lzma": zipfile.ZIP_LZMA, "bzip2": zipfile.ZIP_BZIP2, "store": zipfile.ZIP_STORED}
+# Files up to this size are read once into memory (hash + compress from the same bytes); larger ones are
+# hashed first and then streamed into the archive.
+IN_MEMORY_MAX = 64 * 1024 * 1024
+COPY_CHUNK = 1024 * 1024
+# Fixed member timestamps: the same content always produces the same member bytes.
+_ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+_JOURNAL_MAGIC = b"EBJ1"
+
+
+class BundleError(RuntimeError):
+    pass
+
+
+def _now_utc() -> str:
+    return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+
+
+def blob_name(sha: str) -> str:
+    return f"{BLOB_PREFIX}{sha[:2]}/{sha}"
+
+
+def _pack_member(name: str) -> str:
+    if not name or name.startswith("/") or ".." in name.split("/"):
+        raise BundleError(f"invalid pack name: {name!r}")
+    return f"{PACK_PREFIX}{name}.json"
+
+
+class _ManifestDigests:
+    """sha256 lookups from manifest.json files, trusted only for files not modified after their manifest."""
+
+    def __init__(self) -> None:
+        self._by_dir: dict[str, tuple[float, dict[str, dict]] | None] = {}
+
+    def _load(self, d: str) -> tuple[float, dict[str, dict]] | None:
+        if d not in self._by_dir:
+            path = os.path.join(d, "manifest.json")
+            entry = None
+            try:
+                mtime = os.stat(path).st_mtime_ns
+                data = json.loads(Path(path).read_text(encoding="utf-8"))
+                files = {f["path"]: f for f in data.get("files", []) if isinstance(f, dict) and "path" in f}
+                entry = (mtime, files)
+            except (OSError, ValueError, AttributeError):
+                pass
+            self._by_dir[d] = entry
+        return self._by_dir[d]
+
+    def lookup(self, fs_path: str, st: os.stat_result, top: str) -> str | None:
+        d = os.path.dirname(os.path.abspath(fs_path))
+        rel = os.path.basename(fs_path)
+        top = os.path.abspath(top)
+        while True:
+            loaded = self._load(d)
+            if loaded is not None:
+                mtime, files = loaded
+                f = files.get(rel)
+                if f is not None:
+                    sha = f.get("sha256")
+                    if f.get("size_bytes") == st.st_size and st.st_mtime_ns <= mtime and isinstance(sha, str):
+                        return sha
+                    return None
+            if d == top or os.path.dirname(d) == d:
+                return None
+            rel = os.path.basename(d) + "/" + rel
+            d = os.path.dirname(d)
+
+
+def _collect(root: Path, paths: list[str]) -> list[tuple[str, str, os.stat_result]]:
+    """(relative posix path, filesystem path, stat) for the given files/directories under root, sorted."""
+    out: dict[str, tuple[str, os.stat_result]] = {}
+    for p in paths or ["."]:
+        target = root / p
+        if target.is_file():
+            rel = Path(os.path.relpath(target, root)).as_posix()
+            out[rel] = (str(target), target.stat())
+        elif target.is_dir():
+            prefix = Path(os.path.relpath(target, root)).as_posix()
+            prefix = "" if prefix == "." else prefix + "/"
+            for rel, fs_path, st in iter_files(target, recursive=True):
+                out[prefix + rel] = (fs_path, st)
+        else:
+            raise BundleError(f"not found: {target}")
+    return [(rel, *out[rel]) for rel in sorted(out)]
+
+
+def _fsync_dir(path: Path) -> None:
+    # Persists the rename; directories cannot be opened this way on Windows.
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _journal_path(path: Path) -> Path:
+    return path.with_name(path.name + ".journal")
+
+
+def _lock(path: Path) -> int:
+    """Block until this process holds the writer lock of `path`; released when the fd is closed or the process dies."""
+    fd = os.open(path.with_name(path.name + ".lock"), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+    except OSError as e:
+        os.close(fd)
+        raise BundleError(f"cannot lock {path}: {e}") from None
+    return fd
+
+
+def _create_empty(path: Path) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    zipfile.ZipFile(tmp, "w").close()
+    with open(tmp, "rb+") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(path.parent)
+
+
+def _write_journal(path: Path, fp: IO[bytes], start_dir: int, members: int) -> None:
+    """Save everything from the central directory on (what an append overwrites) before touching the bundle."""
+    fp.seek(start_dir)
+    tail = fp.read()
+    journal = _journal_path(path)
+    tmp = journal.with_name(journal.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_JOURNAL_MAGIC + struct.pack(">QQ", start_dir, members) + tail)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, journal)
+    _fsync_dir(path.parent)
+    fp.seek(start_dir)
+
+
+def _committed(path: Path, start_dir: int, members: int) -> bool:
+    # An interrupted add counts as committed only if its central directory is complete and every member
+    # written after the old end of data reads back with a matching CRC.
+    try:
+        with zipfile.ZipFile(path) as zf:
+            infos = zf.infolist()
+            if len(infos) <= members:
+                return False
+            for info in infos:
+                if info.header_offset >= start_dir:
+                    with zf.open(info) as f:
+                        while f.read(COPY_CHUNK):
+                            pass
+        return True
+    except Exception:
+        return False
+
+
+def _recover(path: Path, rollback: bool = False) -> None:
+    """Complete or undo an add that did not finish (caller holds the lock); a no-op without a journal."""
+    journal = _journal_path(path)
+    try:
+        data = journal.read_bytes()
+    except FileNotFoundError:
+        return
+    if data[: len(_JOURNAL_MAGIC)] != _JOURNAL_MAGIC:
+        raise BundleError(f"unreadable journal: {journal}")
+    start_dir, members = struct.unpack(">QQ", data[len(_JOURNAL_MAGIC) : len(_JOURNAL_MAGIC) + 16])
+    if rollback or not _committed(path, start_dir, members):
+        with open(path, "r+b") as f:
+            f.truncate(start_dir)
+            f.seek(start_dir)
+            f.write(data[len(_JOURNAL_MAGIC) + 16 :])
+            f.flush()
+            os.fsync(f.fileno())
+    journal.unlink()
+    _fsync_dir(path.parent)
+
+
+class BundleWriter:
+    """
+    Append packs to a bundle (created if missing). Use as a context manager, or call close() to commit and
+    abort() to discard.
+
+    Members are appended in place, over the old central directory; writing the new central directory on close()
+    is the commit point. Before the first byte changes, the old central directory and end record are saved to
+    <bundle>.journal, so an abort (or the next writer, after a crash) truncates the bundle back to its old end of
+    data and restores them. An add therefore costs I/O proportional to the new pack, not to the bundle.
+    Concurrent writers are serialised by an OS lock on <bundle>.lock.
+    """
+
+    def __init__(self, path: str | Path, compression: str = "deflate", level: int | None = None) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock_fd = _lock(self.path)
+        self._fp = None
+        try:
+            _recover(self.path)
+            if not self.path.is_file():
+                _create_empty(self.path)
+            self._fp = open(self.path, "r+b")
+            self.zf = zipfile.ZipFile(self._fp, "a", compression=COMPRESSION[compression], compresslevel=level)
+            _write_journal(self.path, self._fp, self.zf.start_dir, len(self.zf.infolist()))
+        except (OSError, zipfile.BadZipFile):
+            if self._fp is not None:
+                self._fp.close()
+            os.close(self._lock_fd)
+            raise
+        names = self.zf.namelist()
+        self.blobs = {n.rsplit("/", 1)[1] for n in names if n.startswith(BLOB_PREFIX)}
+        self.packs = {n[len(PACK_PREFIX) : -len(".json")] for n in names if n.startswith(PACK_PREFIX)}
+        self.digests = _ManifestDigests()
+        self.stats = {"files": 0, "bytes": 0, "new_blobs": 0, "new_bytes": 0, "stored_bytes": 0}
+
+    def __enter__(self) -> "BundleWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def close(self) -> None:
+        if self._fp is None:
+            return
+        self.zf.close()  # writes the new central directory and truncates anything after it
+        self._fp.flush()
+        os.fsync(self._fp.fileno())
+        self._finish()
+        _journal_path(self.path).unlink()
+        _fsync_dir(self.path.parent)
+        os.close(self._lock_fd)
+
+    def abort(self) -> None:
+        if self._fp is None:
+            return
+        self.zf.fp = None  # keep ZipFile.close()/__del__ from writing a central directory
+        self._finish()
+        _recover(self.path, rollback=True)
+        os.close(self._lock_fd)
+
+    def _finish(self) -> None:
+        self._fp.close()
+        self._fp = None
+
+    def _info(self, name: str) -> zipfile.ZipInfo:
+        info = zipfile.ZipInfo(name, date_time=_ZIP_EPOCH)
+        info.compress_type = self.zf.compression
+        info.external_attr = 0o644 << 16
+        return info
+
+    def _add_blob(self, fs_path: str, st: os.stat_result, known_sha: str | None) -> str:
+        if known_sha is not None and known_sha in self.blobs:
+            return known_sha
+        if st.st_size <= IN_MEMORY_MAX:
+            data = Path(fs_path).read_bytes()
+            sha = hashlib.sha256(data).hexdigest()
+            if sha not in self.blobs:
+                self.zf.writestr(self._info(blob_name(sha)), data)
+        else:
+            sha = sha256_file(Path(fs_path))
+            if sha not in self.blobs:
+                info = self._info(blob_name(sha))
+                info.file_size = st.st_size
+                with open(fs_path, "rb") as src, self.zf.open(info, "w", force_zip64=True) as dst:
+                    shutil.copyfileobj(src, dst, COPY_CHUNK)
+        if sha not in self.blobs:
+            self.blobs.add(sha)
+            self.stats["new_blobs"] += 1
+            self.stats["new_bytes"] += st.st_size
+            self.stats["stored_bytes"] += self.zf.getinfo(blob_name(sha)).compress_size
+        return sha
+
+    def add_pack(self, name: str, root: str | Path, paths: list[str] | None = None) -> dict:
+        """Add the files under `root` (or the given files/directories relative to it) as pack `name`."""
+        member = _pack_member(name)
+        if name in self.packs:
+            raise BundleError(f"pack already in bundle: {name}")
+        root = Path(root)
+        files = []
+        for rel, fs_path, st in _collect(root, paths or []):
+            sha = self._add_blob(fs_path, st, self.digests.lookup(fs_path, st, str(root)))
+            files.append({"path": rel, "size_bytes": st.st_size, "sha256": sha})
+            self.stats["files"] += 1
+            self.stats["bytes"] += st.st_size
+        index = {"schema_version": BUNDLE_SCHEMA_VERSION, "name": name, "created_at_utc": _now_utc(), "files": files}
+        self.zf.writestr(self._info(member), json.dumps(index, ensure_ascii=False, indent=2) + "\n")
+        self.packs.add(name)
+        return index
+
+
+class Bundle:
+    """Lazy reader: opening reads the zip central directory; members are decompressed only when asked for."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        if _journal_path(self.path).is_file():
+            raise BundleError(f"{self.path} is being written, or an add was interrupted (the next add recovers it)")
+        self.zf = zipfile.ZipFile(self.path)
+        self._index: dict[str, dict] = {}
+
+    def __enter__(self) -> "Bundle":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.zf.close()
+
+    def packs(self) -> list[str]:
+        return sorted(n[len(PACK_PREFIX) : -len(".json")] for n in self.zf.namelist() if n.startswith(PACK_PREFIX))
+
+    def files(self, pack: str) -> list[dict]:
+        if pack not in self._index:
+            try:
+                self._index[pack] = json.loads(self.zf.read(_pack_member(pack)).decode("utf-8"))
+            except KeyError:
+                raise BundleError(f"no such pack: {pack}") from None
+        return self._index[pack]["files"]
+
+    def _entry(self, pack: str, path: str) -> dict:
+        for f in self.files(pack):
+            if f["path"] == path:
+                return f
+        raise BundleError(f"no such file in pack {pack}: {path}")
+
+    def open(self, pack: str, path: str) -> IO[bytes]:
+        """Stream one artifact (decompressed on the fly)."""
+        return self.zf.open(blob_name(self._entry(pack, path)["sha256"]))
+
+    def read(self, pack: str, path: str) -> bytes:
+        with self.open(pack, path) as f:
+            return f.read()
+
+    def extract(self, pack: str, dest: str | Path, paths: list[str] | None = None) -> list[Path]:
+        """Write the pack's files (or just `paths`) under dest, checking each SHA-256 while copying."""
+        dest = Path(dest)
+        entries = [self._entry(pack, p) for p in paths] if paths else self.files(pack)
+        written = []
+        root = dest.resolve()
+        for f in entries:
+            out = dest / f["path"]
+            rel = f["path"].replace("\\", "/")
+            # Index entries come from the archive: never let one write outside dest.
+            if rel.startswith("/") or ".." in rel.split("/") or Path(rel).is_absolute() or Path(rel).drive:
+                raise BundleError(f"unsafe path in pack {pack}: {f['path']!r}")
+            if not out.resolve().is_relative_to(root):
+                raise BundleError(f"unsafe path in pack {pack}: {f['path']!r}")
+            out.parent.mkdir(parents=True, exist_ok=True)
+            h = hashlib.sha256()
+            tmp = out.with_name(out.name + ".tmp")
+            with self.zf.open(blob_name(f["sha256"])) as src, open(tmp, "wb") as dst:
+                for block in iter(lambda: src.read(COPY_CHUNK), b""):
+                    h.update(block)
+                    dst.write(block)
+            if h.hexdigest() != f["sha256"]:
+                tmp.unlink()
+                raise BundleError(f"digest mismatch for {pack}:{f['path']}")
+            os.replace(tmp, out)
+            written.append(out)
+        return written
+
+    def verify(self) -> list[str]:
+        """Rehash every blob and check every pack entry resolves; returns a list of problems."""
+        problems = []
+        blobs = {n.rsplit("/", 1)[1] for n in self.zf.namelist() if n.startswith(BLOB_PREFIX)}
+        for sha in sorted(blobs):
+            h = hashlib.sha256()
+            with self.zf.open(blob_name(sha)) as src:
+                for block in iter(lambda: src.read(COPY_CHUNK), b""):
+                    h.update(block)
+            if h.hexdigest() != sha:
+                problems.append(f"blob content does not match its name: {sha}")
+        for pack in self.packs():
+            for f in self.files(pack):
+                if f["sha256"] not in blobs:
+                    problems.append(f"missing blob for {pack}:{f['path']}")
+                elif self.zf.getinfo(blob_name(f["sha256"])).file_size != f["size_bytes"]:
+                    problems.append(f"size mismatch for {pack}:{f['path']}")
+        return problems
+
+
+def _mb(n: int) -> str:
+    return f"{n / (1024 * 1024):.1f} MB"
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Build and read content-addressed evidence bundles (zip, deduplicated by SHA-256).")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    a = sub.add_parser("add", help="Append one pack to a bundle (created if missing)")
+    a.add_argument("--bundle", required=True, help="Bundle path, e.g. _archive/nightly.zip")
+    a.add_argument("--name", required=True, help="Pack name inside the bundle, e.g. 2026-10-17 (must be new)")
+    a.add_argument("--dir", required=True, help="Pack root; stored paths are relative to it")
+    a.add_argument("paths", nargs="*", help="Files/directories under --dir to include (default: everything)")
+    a.add_argument("--compression", choices=sorted(COMPRESSION), default="deflate")
+    a.add_argument("--level", type=int, default=None, help="Compression level (deflate 0-9, bzip2 1-9)")
+
+    ls = sub.add_parser("list", help="List packs, or the files of one pack")
+    ls.add_argument("--bundle", required=True)
+    ls.add_argument("--name", default="", help="Pack to list")
+
+    x = sub.add_parser("extract", help="Extract one pack, or selected files of it")
+    x.add_argument("--bundle", required=True)
+    x.add_argument("--name", required=True)
+    x.add_argument("--out", required=True, help="Destination directory")
+    x.add_argument("paths", nargs="*", help="Files to extract (default: all files of the pack)")
+
+    v = sub.add_parser("verify", help="Rehash all blobs and check every pack index resolves")
+    v.add_argument("--bundle", required=True)
+    args = p.parse_args()
+
+    if args.cmd != "add" and not Path(args.bundle).is_file():
+        print(f"Missing bundle: {args.bundle}")
+        return 2
+    try:
+        if args.cmd == "add":
+            with BundleWriter(args.bundle, args.compression, args.level) as w:
+                w.add_pack(args.name, args.dir, args.paths)
+            s = w.stats
+            print(
+                f"OK: added {args.name} to {args.bundle}: {s['files']} file(s), {_mb(s['bytes'])}; "
+                f"{s['new_blobs']} new blob(s), {_mb(s['new_bytes'])} -> {_mb(s['stored_bytes'])} stored"
+            )
+            return 0
+        with Bundle(args.bundle) as b:
+            if args.cmd == "list":
+                if not args.name:
+                    for name in b.packs():
+                        print(name)
+                    return 0
+                for f in b.files(args.name):
+                    print(f"{f['sha256'][:12]}  {f['size_bytes']:>12}  {f['path']}")
+                return 0
+            if args.cmd == "extract":
+                written = b.extract(args.name, args.out, args.paths)
+                print(f"OK: extracted {len(written)} file(s) to {args.out}")
+                return 0
+            problems = b.verify()
+    except BundleError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    if problems:
+        print(f"FAILED: {len(problems)} problem(s) found")
+        for msg in problems:
+            print(f"- {msg}")
+        return 3
+    print("OK: bundle verified")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
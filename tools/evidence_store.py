@@ -0,0 +1,327 @@
+"""
+Append-only local evidence store (SQLite, no server) over many evidence packs.
+
+    python tools/evidence_store.py ingest --db _store/evidence.sqlite --discover ../nightly
+    python tools/evidence_store.py query --db _store/evidence.sqlite --metric load_time_ms_p95 \\
+        --quant Q4_K_M --cpu "%Ryzen 9%" --since 2026-09-17
+    python tools/evidence_store.py query --db ... --metric load_time_ms_p50 --metric peak_memory_mb --out trend.csv
+
+A pack is identified by the SHA-256 of its manifest.json; packs already in the store are skipped without
+parsing, so re-ingesting a growing nightly tree only reads the new packs. Packs without a manifest are
+skipped (seal them with make_manifest.py first). Rows are never updated or deleted.
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from collect_env import env_fingerprint
+from validate_artifacts import discover_artifacts
+
+
+STORE_SCHEMA_VERSION = 1
+QUERY_COLUMNS = ["run_at_utc", "baseline_name", "baseline_version", "quant_profile", "backend", "device_cpu", "manifest_sha256"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS packs (
+    id INTEGER PRIMARY KEY,
+    manifest_sha256 TEXT NOT NULL UNIQUE,
+    source TEXT NOT NULL,
+    ingested_at_utc TEXT NOT NULL,
+    run_at_utc TEXT NOT NULL,
+    data_status TEXT,
+    baseline_name TEXT,
+    baseline_version TEXT,
+    quant_profile TEXT,
+    backend TEXT,
+    device_os TEXT,
+    device_cpu TEXT,
+    device_ram_gb TEXT,
+    env_fingerprint TEXT,
+    results_json TEXT NOT NULL,
+    env_json TEXT,
+    manifest_json TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    pack_id INTEGER NOT NULL REFERENCES packs(id),
+    name TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (name, pack_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS packs_by_key ON packs (baseline_name, quant_profile, backend, device_cpu, run_at_utc);
+CREATE INDEX IF NOT EXISTS packs_by_date ON packs (run_at_utc);
+CREATE TRIGGER IF NOT EXISTS packs_append_only_u BEFORE UPDATE ON packs BEGIN SELECT RAISE(ABORT, 'append-only'); END;
+CREATE TRIGGER IF NOT EXISTS packs_append_only_d BEFORE DELETE ON packs BEGIN SELECT RAISE(ABORT, 'append-only'); END;
+CREATE TRIGGER IF NOT EXISTS metrics_append_only_u BEFORE UPDATE ON metrics BEGIN SELECT RAISE(ABORT, 'append-only'); END;
+CREATE TRIGGER IF NOT EXISTS metrics_append_only_d BEFORE DELETE ON metrics BEGIN SELECT RAISE(ABORT, 'append-only'); END;
+"""
+
+
+def _now_utc() -> str:
+    return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+
+
+def connect(path: str | Path) -> sqlite3.Connection:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(path)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    version = con.execute("PRAGMA user_version").fetchone()[0]
+    if version not in (0, STORE_SCHEMA_VERSION):
+        con.close()
+        raise RuntimeError(f"unsupported store schema version {version} in {path}")
+    con.executescript(_SCHEMA)
+    con.execute(f"PRAGMA user_version={STORE_SCHEMA_VERSION}")
+    return con
+
+
+def connect_readonly(path: str | Path) -> sqlite3.Connection:
+    """Open an existing store for queries only: nothing is created, migrated or written."""
+    uri = Path(path).resolve().as_uri() + "?mode=ro"
+    con = sqlite3.connect(uri, uri=True)
+    try:
+        version = con.execute("PRAGMA user_version").fetchone()[0]
+    except sqlite3.OperationalError:
+        # A WAL store in a read-only directory: its -shm file cannot be created, and nothing can be writing it.
+        con.close()
+        con = sqlite3.connect(uri + "&immutable=1", uri=True)
+        try:
+            version = con.execute("PRAGMA user_version").fetchone()[0]
+        except sqlite3.DatabaseError:
+            con.close()
+            raise
+    except sqlite3.DatabaseError:
+        con.close()
+        raise
+    if version != STORE_SCHEMA_VERSION:
+        con.close()
+        raise sqlite3.DatabaseError(f"not an evidence store (schema version {version})")
+    return con
+
+
+def _check_iso(value: str) -> None:
+    """Raise ValueError unless `value` is an ISO date or date-time (what --since/--until compare against)."""
+    if len(value) == 10:
+        date.fromisoformat(value)
+    else:
+        datetime.fromisoformat(value)
+
+
+def _scalar_metrics(metrics: dict) -> list[tuple[str, float]]:
+    # Numbers only; sample arrays and histograms stay in results_json.
+    return [
+        (k, float(v)) for k, v in metrics.items() if isinstance(v, (int, float)) and not isinstance(v, bool)
+    ]
+
+
+def ingest_pack(con: sqlite3.Connection, artifacts: Path, known: set[str], source: str = "") -> str:
+    """Insert one pack; returns "added", "known" (manifest digest already stored) or "unsealed" (no manifest)."""
+    try:
+        manifest_bytes = (artifacts / "manifest.json").read_bytes()
+    except OSError:
+        return "unsealed"
+    digest = hashlib.sha256(manifest_bytes).hexdigest()
+    if digest in known:
+        return "known"
+    results_text = (artifacts / "results.json").read_text(encoding="utf-8")
+    results = json.loads(results_text)
+    env_path = artifacts / "env.json"
+    env_text = env_path.read_text(encoding="utf-8") if env_path.is_file() else None
+    env = json.loads(env_text) if env_text else None
+    # The run time is when env.json was collected; packs without it fall back to the manifest's mtime.
+    run_at = (env or {}).get("generated_at_utc") or datetime.fromtimestamp(
+        (artifacts / "manifest.json").stat().st_mtime, timezone.utc
+    ).replace(microsecond=0).isoformat()
+    baseline = results.get("baseline") or {}
+    device = results.get("device") or {}
+    cur = con.execute(
+        "INSERT INTO packs (manifest_sha256, source, ingested_at_utc, run_at_utc, data_status, baseline_name,"
+        " baseline_version, quant_profile, backend, device_os, device_cpu, device_ram_gb, env_fingerprint,"
+        " results_json, env_json, manifest_json) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+        (
+            digest,
+            source or artifacts.as_posix(),
+            _now_utc(),
+            run_at,
+            results.get("data_status"),
+            baseline.get("name"),
+            baseline.get("version"),
+            baseline.get("quant_profile"),
+            baseline.get("backend"),
+            device.get("os"),
+            device.get("cpu"),
+            device.get("ram_gb"),
+            env_fingerprint(env) if env is not None else None,
+            results_text,
+            env_text,
+            manifest_bytes.decode("utf-8"),
+        ),
+    )
+    pack_id = cur.lastrowid
+    con.executemany(
+        "INSERT INTO metrics (pack_id, name, value) VALUES (?,?,?)",
+        [(pack_id, k, v) for k, v in _scalar_metrics(results.get("metrics") or {})],
+    )
+    known.add(digest)
+    return "added"
+
+
+def ingest(con: sqlite3.Connection, packs: list[Path], base: Path | None = None) -> dict[str, int]:
+    """Ingest packs in one transaction; a pack that fails to parse is counted as "error" and skipped."""
+    counts = {"added": 0, "known": 0, "unsealed": 0, "error": 0}
+    known = {row[0] for row in con.execute("SELECT manifest_sha256 FROM packs")}
+    with con:
+        for artifacts in packs:
+            # Relative to the discovery root, so the store carries no local directories.
+            source = Path(os.path.relpath(artifacts, base)).as_posix() if base is not None else ""
+            try:
+                counts[ingest_pack(con, artifacts, known, source)] += 1
+            except (OSError, ValueError, AttributeError) as e:
+                print(f"skip {artifacts}: {e}", file=sys.stderr)
+                counts["error"] += 1
+    return counts
+
+
+def query(
+    con: sqlite3.Connection,
+    metrics: list[str],
+    baseline: str = "",
+    quant: str = "",
+    backend: str = "",
+    cpu: str = "",
+    since: str = "",
+    until: str = "",
+    status: str = "",
+) -> tuple[list[str], list[tuple]]:
+    """
+    One row per pack (oldest first) with the requested metrics as columns (NULL where a pack lacks one).
+    `cpu` is a SQL LIKE pattern; `since` / `until` compare against the ISO run time, so dates work as prefixes.
+    """
+    where, params = [], []
+    for col, value in (("baseline_name", baseline), ("quant_profile", quant), ("backend", backend), ("data_status", status)):
+        if value:
+            where.append(f"p.{col} = ?")
+            params.append(value)
+    if cpu:
+        where.append("p.device_cpu LIKE ?")
+        params.append(cpu)
+    if since:
+        where.append("p.run_at_utc >= ?")
+        params.append(since)
+    if until:
+        if len(until) == 10:
+            # A bare date is inclusive: "2026-10-17" covers the whole day.
+            where.append("p.run_at_utc < ?")
+            params.append((date.fromisoformat(until) + timedelta(days=1)).isoformat())
+        else:
+            where.append("p.run_at_utc <= ?")
+            params.append(until)
+    joins, cols = [], []
+    for i, name in enumerate(metrics):
+        joins.append(f"LEFT JOIN metrics m{i} ON m{i}.pack_id = p.id AND m{i}.name = ?")
+        cols.append(f"m{i}.value")
+    sql = (
+        f"SELECT {', '.join('p.' + c for c in QUERY_COLUMNS)}{''.join(', ' + c for c in cols)} FROM packs p "
+        + " ".join(joins)
+        + (" WHERE " + " AND ".join(where) if where else "")
+        + " ORDER BY p.run_at_utc, p.id"
+    )
+    rows = con.execute(sql, metrics + params).fetchall()
+    return QUERY_COLUMNS + metrics, rows
+
+
+def _print_table(header: list[str], rows: list[tuple]) -> None:
+    cells = [header] + [["" if v is None else str(v) for v in row] for row in rows]
+    widths = [max(len(r[i]) for r in cells) for i in range(len(header))]
+    for r in cells:
+        print("  ".join(c.ljust(w) for c, w in zip(r, widths)).rstrip())
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Append-only SQLite store of evidence packs with indexed queries.")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    i = sub.add_parser("ingest", help="Add packs (skips manifest digests already stored)")
+    i.add_argument("--db", required=True, help="Store path, e.g. _store/evidence.sqlite (keep it outside artifacts/)")
+    i.add_argument("--artifacts", action="append", default=[], help="Pack directory (repeatable)")
+    i.add_argument("--discover", default="", help="Ingest every 'artifacts' directory under this root")
+
+    q = sub.add_parser("query", help="Time series of metrics per pack, filtered by baseline/quant/backend/device/date")
+    q.add_argument("--db", required=True)
+    q.add_argument("--metric", action="append", default=[], help="Metric name from results.json (repeatable)")
+    q.add_argument("--baseline", default="", help="baseline.name")
+    q.add_argument("--quant", default="", help="baseline.quant_profile, e.g. Q4_K_M")
+    q.add_argument("--backend", default="", help="baseline.backend")
+    q.add_argument("--cpu", default="", help="device.cpu as a SQL LIKE pattern, e.g. %%Ryzen%%")
+    q.add_argument("--status", default="", help="data_status, e.g. measured")
+    q.add_argument("--since", default="", help="Earliest run date/time (ISO, e.g. 2026-09-17)")
+    q.add_argument("--until", default="", help="Latest run date/time, inclusive (ISO)")
+    q.add_argument("--out", default="", help="Export to .csv or .json instead of printing a table")
+    args = p.parse_args()
+
+    if args.cmd == "query":
+        for flag, value in (("--since", args.since), ("--until", args.until)):
+            try:
+                if value:
+                    _check_iso(value)
+            except ValueError:
+                print(f"Invalid {flag} (expected an ISO date or date-time, e.g. 2026-10-17): {value}")
+                return 2
+        if not Path(args.db).is_file():
+            print(f"Missing store: {args.db}")
+            return 2
+        try:
+            con = connect_readonly(args.db)
+        except sqlite3.DatabaseError as e:
+            print(f"Invalid store: {args.db}: {e}")
+            return 2
+    else:
+        con = connect(args.db)
+    try:
+        if args.cmd == "ingest":
+            if not args.artifacts and not args.discover:
+                p.error("one of --artifacts or --discover is required")
+            base = Path(args.discover) if args.discover else None
+            packs = [Path(a) for a in args.artifacts] + (discover_artifacts(base) if base is not None else [])
+            counts = ingest(con, packs, base)
+            total = con.execute("SELECT COUNT(*) FROM packs").fetchone()[0]
+            print(
+                f"OK: added {counts['added']}, already known {counts['known']}, unsealed {counts['unsealed']},"
+                f" errors {counts['error']}; {total} pack(s) in store"
+            )
+            return 0 if counts["error"] == 0 else 3
+
+        if not args.metric:
+            args.metric = ["load_time_ms_p50", "load_time_ms_p95"]
+        header, rows = query(
+            con, args.metric, args.baseline, args.quant, args.backend, args.cpu, args.since, args.until, args.status
+        )
+    finally:
+        con.close()
+
+    if not args.out:
+        _print_table(header, rows)
+        return 0
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    if out.suffix.lower() == ".json":
+        data = [dict(zip(header, row)) for row in rows]
+        out.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    else:
+        with out.open("w", encoding="utf-8", newline="") as f:
+            w = csv.writer(f, lineterminator="\n")
+            w.writerow(header)
+            w.writerows(rows)
+    print(f"Wrote: {out} ({len(rows)} row(s))")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
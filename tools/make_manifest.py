@@ -1,48 +1,265 @@
 import argparse
-import hashlib
+import fnmatch
+import functools
 import json
+import os
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
+from typing import TextIO
 
+from hashing import BACKENDS, sha256_file
+from merkle import DEFAULT_CHUNK_SIZE, MerkleBuilder, hash_file_chunks, pack_leaf_hash
 
-def sha256_file(path: Path) -> str:
-    h = hashlib.sha256()
-    with path.open("rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
-    return h.hexdigest()
+
+CACHE_SCHEMA_VERSION = "0.1"
+
+
+def _cache_key(path: str, st: os.stat_result) -> list:
+    # (path, size, mtime_ns, inode): any change to one of these forces a rehash.
+    return [os.path.abspath(path), st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+def _load_cache(path: Path | None) -> dict[str, dict]:
+    if path is None or not path.is_file():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+    if not isinstance(data, dict) or data.get("schema_version") != CACHE_SCHEMA_VERSION:
+        return {}
+    entries = data.get("entries")
+    return entries if isinstance(entries, dict) else {}
+
+
+def _save_cache(path: Path, entries: dict[str, dict]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {"schema_version": CACHE_SCHEMA_VERSION, "entries": entries}
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, sort_keys=True) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _make_pool(kind: str, jobs: int) -> Executor:
+    if kind == "process":
+        return ProcessPoolExecutor(max_workers=jobs)
+    # hashlib releases the GIL while digesting large buffers, so threads scale for I/O + hashing.
+    return ThreadPoolExecutor(max_workers=jobs)
+
+
+def _matches(rel: str, patterns: list[str]) -> bool:
+    return any(fnmatch.fnmatch(rel, pat) for pat in patterns)
+
+
+def iter_files(
+    root: Path,
+    recursive: bool = False,
+    include: list[str] | None = None,
+    exclude: list[str] | None = None,
+    skip: set[str] | None = None,
+) -> Iterator[tuple[str, str, os.stat_result]]:
+    """
+    Yield (relative posix path, filesystem path, stat) for every file under root, in a stable order.
+
+    Entries are sorted per directory and directories are visited when encountered, so the walk never holds
+    more than one directory listing per level. Globs match the relative posix path (e.g. "frames/*.png");
+    an excluded directory is pruned without being listed.
+    """
+    include = include or []
+    exclude = exclude or []
+    skip = skip or set()
+
+    def _walk(dir_path: str, prefix: str) -> Iterator[tuple[str, str, os.stat_result]]:
+        with os.scandir(dir_path) as it:
+            entries = sorted(it, key=lambda e: os.path.normcase(e.name))
+        for e in entries:
+            rel = prefix + e.name
+            if e.is_dir(follow_symlinks=False):
+                if recursive and not _matches(rel, exclude):
+                    yield from _walk(e.path, rel + "/")
+                continue
+            if not e.is_file():
+                continue
+            if os.path.normcase(os.path.abspath(e.path)) in skip:
+                continue
+            if include and not _matches(rel, include):
+                continue
+            if exclude and _matches(rel, exclude):
+                continue
+            yield rel, e.path, e.stat()
+
+    yield from _walk(str(root), "")
+
+
+class _ManifestWriter:
+    """Stream manifest entries to disk, byte-identical to json.dumps(data, indent=2)."""
+
+    def __init__(self, f: TextIO, schema_version: str = "0.1") -> None:
+        self._f = f
+        self._n = 0
+        f.write("{\n")
+        f.write(f"  \"schema_version\": {json.dumps(schema_version)},\n")
+        f.write("  \"files\": [")
+
+    def add(self, item: dict) -> None:
+        body = json.dumps(item, ensure_ascii=False, indent=2).replace("\n", "\n    ")
+        self._f.write(("\n" if self._n == 0 else ",\n") + "    " + body)
+        self._n += 1
+
+    def close(self, merkle: dict | None = None) -> int:
+        self._f.write("\n  ]" if self._n else "]")
+        if merkle is not None:
+            body = json.dumps(merkle, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+            self._f.write(",\n  \"merkle\": " + body)
+        self._f.write("\n}\n")
+        return self._n
+
+
+def _hash_fields(path: Path, backend: str, chunk_size: int) -> dict:
+    """Digest fields for one manifest entry; chunk_size > 0 adds the v0.2 Merkle fields."""
+    if chunk_size <= 0:
+        return {"sha256": sha256_file(path, backend=backend)}
+    sha, chunks, root = hash_file_chunks(path, chunk_size)
+    return {"sha256": sha, "merkle_root": root, "chunks": chunks}
+
+
+def _cache_hit(hit: dict | None, key: list, chunk_size: int) -> dict | None:
+    if not hit or hit.get("key") != key or not isinstance(hit.get("sha256"), str):
+        return None
+    fields = {"sha256": hit["sha256"]}
+    if chunk_size > 0:
+        m = hit.get("merkle")
+        if not isinstance(m, dict) or m.get("chunk_size") != chunk_size:
+            return None
+        fields["merkle_root"] = m["root"]
+        fields["chunks"] = m["chunks"]
+    return fields
+
+
+def _cache_entry(key: list, fields: dict, chunk_size: int, old: dict | None = None) -> dict:
+    entry = {"key": key, "sha256": fields["sha256"]}
+    if chunk_size > 0:
+        entry["merkle"] = {"chunk_size": chunk_size, "root": fields["merkle_root"], "chunks": fields["chunks"]}
+    elif old and old.get("key") == key and old.get("sha256") == fields["sha256"] and "merkle" in old:
+        # Keep chunk hashes from an earlier --merkle run so switching modes does not invalidate them.
+        entry["merkle"] = old["merkle"]
+    return entry
+
+
+def _hash_stream(
+    entries: Iterator[tuple[str, str, os.stat_result]],
+    cache: dict[str, dict],
+    new_cache: dict[str, dict],
+    pool: Executor | None,
+    window: int,
+    stats: dict[str, int],
+    backend: str = "auto",
+    chunk_size: int = 0,
+) -> Iterator[dict]:
+    # Keep at most `window` files in flight so memory stays bounded on very large trees.
+    pending: deque[tuple[dict, list, Future | None]] = deque()
+    hash_file = functools.partial(_hash_fields, backend=backend, chunk_size=chunk_size)
+
+    def _finish(item: dict, key: list, fut: Future | None) -> dict:
+        if fut is not None:
+            item.update(fut.result())
+            new_cache[key[0]] = _cache_entry(key, item, chunk_size, cache.get(key[0]))
+        return item
+
+    for rel, fs_path, st in entries:
+        key = _cache_key(fs_path, st)
+        item = {"path": rel, "size_bytes": st.st_size, "sha256": ""}
+        hit = cache.get(key[0])
+        cached = _cache_hit(hit, key, chunk_size)
+        fut: Future | None = None
+        if cached is not None:
+            item.update(cached)
+            new_cache[key[0]] = hit
+            stats["cached"] += 1
+        elif pool is None:
+            item.update(hash_file(Path(fs_path)))
+            new_cache[key[0]] = _cache_entry(key, item, chunk_size, hit)
+            stats["hashed"] += 1
+        else:
+            fut = pool.submit(hash_file, Path(fs_path))
+            stats["hashed"] += 1
+        pending.append((item, key, fut))
+        while len(pending) > window or (pending and pending[0][2] is None):
+            yield _finish(*pending.popleft())
+    while pending:
+        yield _finish(*pending.popleft())
 
 
 def main() -> int:
     p = argparse.ArgumentParser(description="Generate manifest.json (size + sha256) for artifacts directory.")
     p.add_argument("--dir", required=True, help="Directory to scan (usually ./artifacts)")
     p.add_argument("--out", required=True, help="Output manifest.json path")
+    p.add_argument("--recursive", action="store_true", help="Include files in subdirectories (paths are relative, '/'-separated)")
+    p.add_argument("--include", action="append", default=[], help="Glob on the relative path to include (repeatable)")
+    p.add_argument("--exclude", action="append", default=[], help="Glob on the relative path to exclude (repeatable)")
+    p.add_argument("--jobs", type=int, default=1, help="Parallel hashing workers (default: 1 = serial)")
+    p.add_argument("--pool", choices=["thread", "process"], default="thread", help="Worker pool kind for --jobs > 1")
+    p.add_argument("--hash-backend", choices=BACKENDS, default="auto", help="File hashing backend (see tools/hashing.py)")
+    p.add_argument(
+        "--cache",
+        default="",
+        help="Optional hash cache file keyed on (path, size, mtime_ns, inode). Keep it outside the scanned directory.",
+    )
+    p.add_argument("--full", action="store_true", help="Ignore cached hashes and rehash every file")
+    p.add_argument(
+        "--merkle",
+        action="store_true",
+        help="Write manifest v0.2 with per-chunk hashes, per-file merkle_root and a pack root (see spec 3.3)",
+    )
+    p.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Chunk size in bytes for --merkle")
     args = p.parse_args()
+    if args.merkle and args.chunk_size <= 0:
+        print("--chunk-size must be positive")
+        return 2
+    chunk_size = args.chunk_size if args.merkle else 0
 
     root = Path(args.dir)
     out = Path(args.out)
     out.parent.mkdir(parents=True, exist_ok=True)
+    cache_path = Path(args.cache) if args.cache else None
+    if cache_path is not None and cache_path.resolve().is_relative_to(root.resolve()):
+        print(f"Refusing to place hash cache inside the scanned directory: {cache_path}")
+        return 2
+
+    cache = {} if args.full else _load_cache(cache_path)
+    new_cache: dict[str, dict] = {}
+    stats = {"hashed": 0, "cached": 0}
 
-    files = []
-    for path in sorted(root.glob("*")):
-        if not path.is_file():
-            continue
-        if path.name == out.name:
-            continue
-        files.append(
-            {
-                "path": path.name,
-                "size_bytes": path.stat().st_size,
-                "sha256": sha256_file(path),
-            }
-        )
-
-    data = {"schema_version": "0.1", "files": files}
-    out.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
-    print(f"Wrote: {out}")
+    # The output manifest never lists itself (top-level files sharing its name are skipped, as before).
+    skip = {os.path.normcase(str(out.resolve())), os.path.normcase(os.path.abspath(root / out.name))}
+    entries = iter_files(root, recursive=args.recursive, include=args.include, exclude=args.exclude, skip=skip)
+
+    tmp = out.with_name(out.name + ".tmp")
+    skip.add(os.path.normcase(str(tmp.resolve())))
+    pool = _make_pool(args.pool, args.jobs) if args.jobs > 1 else None
+    try:
+        with tmp.open("w", encoding="utf-8") as f:
+            writer = _ManifestWriter(f, "0.2" if chunk_size else "0.1")
+            pack = MerkleBuilder()
+            window = max(1, args.jobs) * 4
+            for item in _hash_stream(entries, cache, new_cache, pool, window, stats, args.hash_backend, chunk_size):
+                writer.add(item)
+                if chunk_size:
+                    pack.add(pack_leaf_hash(item["path"], item["size_bytes"], item["merkle_root"]))
+            merkle = {"algorithm": "sha256", "chunk_size": chunk_size, "root": pack.root()} if chunk_size else None
+            writer.close(merkle)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    os.replace(tmp, out)
+
+    if cache_path is not None:
+        _save_cache(cache_path, new_cache)
+    print(f"Wrote: {out}" + (f" (hashed={stats['hashed']} cached={stats['cached']})" if cache_path else ""))
     return 0
 
 
 if __name__ == "__main__":
     raise SystemExit(main())
-
-
@@ -0,0 +1,132 @@
+"""
+Merkle-tree helpers for manifest v0.2 (see spec/SPEC_UMC_FORMAT.md, section 3.3).
+
+- chunk leaf:  sha256(0x00 || chunk bytes)
+- inner node:  sha256(0x01 || left || right); an unpaired last node is promoted unchanged
+- pack leaf:   sha256(0x02 || utf8(path) || 0x00 || size as 8-byte big-endian || file merkle_root)
+
+A file is split into fixed-size chunks (the last one may be short); an empty file has one empty chunk.
+"""
+import hashlib
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+
+_local = threading.local()
+
+
+def _buffer(size: int) -> memoryview:
+    buf = getattr(_local, "buf", None)
+    if buf is None or len(buf) != size:
+        buf = memoryview(bytearray(size))
+        _local.buf = buf
+    return buf
+
+
+def leaf_hash(data) -> bytes:
+    h = hashlib.sha256(b"\x00")
+    h.update(data)
+    return h.digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def pack_leaf_hash(path: str, size: int, file_root_hex: str) -> bytes:
+    return hashlib.sha256(
+        b"\x02" + path.encode("utf-8") + b"\x00" + int(size).to_bytes(8, "big") + bytes.fromhex(file_root_hex)
+    ).digest()
+
+
+class MerkleBuilder:
+    """Incremental Merkle root in O(log n) memory; same result as pairing level by level."""
+
+    def __init__(self) -> None:
+        self._stack: list[tuple[int, bytes]] = []
+        self.count = 0
+
+    def add(self, leaf: bytes) -> None:
+        height, node = 0, leaf
+        while self._stack and self._stack[-1][0] == height:
+            _, left = self._stack.pop()
+            node = node_hash(left, node)
+            height += 1
+        self._stack.append((height, node))
+        self.count += 1
+
+    def root(self) -> str:
+        if not self._stack:
+            return leaf_hash(b"").hex()
+        node = self._stack[-1][1]
+        for _, left in reversed(self._stack[:-1]):
+            node = node_hash(left, node)
+        return node.hex()
+
+
+def merkle_root(leaves: Iterable[bytes]) -> str:
+    b = MerkleBuilder()
+    for leaf in leaves:
+        b.add(leaf)
+    return b.root()
+
+
+def root_from_hex(chunks: Iterable[str]) -> str:
+    return merkle_root(bytes.fromhex(c) for c in chunks)
+
+
+def pack_root(files: Iterable[dict]) -> str:
+    return merkle_root(pack_leaf_hash(it["path"], it["size_bytes"], it["merkle_root"]) for it in files)
+
+
+def chunk_count(size: int, chunk_size: int) -> int:
+    return max(1, -(-size // chunk_size))
+
+
+def hash_file_chunks(path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> tuple[str, list[str], str]:
+    """One read pass: (full-file sha256, per-chunk leaf hashes, file merkle_root)."""
+    full = hashlib.sha256()
+    leaves: list[str] = []
+    builder = MerkleBuilder()
+    buf = _buffer(chunk_size)
+    with path.open("rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buf)
+            if not n and leaves:
+                break
+            view = buf[:n]
+            # readinto may return short reads; fill the chunk before hashing it.
+            while n and n < chunk_size:
+                more = f.readinto(buf[n:])
+                if not more:
+                    break
+                n += more
+                view = buf[:n]
+            full.update(view)
+            leaf = leaf_hash(view)
+            leaves.append(leaf.hex())
+            builder.add(leaf)
+            if n < chunk_size:
+                break
+    return full.hexdigest(), leaves, builder.root()
+
+
+def read_chunk_leaf(f, index: int, chunk_size: int, full=None) -> str:
+    """Hash a single chunk of an open binary file (seek + readinto into the shared buffer).
+
+    `full`, if given, is a hashlib object also fed the chunk bytes (sequential callers get the file sha256 for free).
+    """
+    buf = _buffer(chunk_size)
+    f.seek(index * chunk_size)
+    n = 0
+    while n < chunk_size:
+        more = f.readinto(buf[n:])
+        if not more:
+            break
+        n += more
+    if full is not None:
+        full.update(buf[:n])
+    return leaf_hash(buf[:n]).hex()
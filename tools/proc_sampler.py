@@ -0,0 +1,244 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+
+SCHEMA_VERSION = "0.1"
+DEFAULT_INTERVAL_MS = 100
+# Per-process counters, cumulative since the process started (the summary uses last - first).
+COUNTERS = ["minflt", "majflt", "read_bytes", "write_bytes", "vol_ctxt", "nonvol_ctxt", "cpu_ticks"]
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_KB = (os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096) // 1024
+
+
+class _ProcFile:
+    """A /proc file kept open and re-read with pread(0), instead of open/read/close on every sample."""
+
+    def __init__(self, path: str) -> None:
+        self.fd = os.open(path, os.O_RDONLY)
+
+    def read(self) -> str:
+        return os.pread(self.fd, 65536, 0).decode("ascii", errors="ignore")
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def _parse_stat(text: str) -> tuple[int, int, int, int]:
+    # Fields after the ")" that closes comm: minflt is field 10, majflt 12, utime 14, stime 15, rss 24 (1-based).
+    f = text[text.rindex(")") + 2 :].split()
+    return int(f[7]), int(f[9]), int(f[11]) + int(f[12]), int(f[21]) * _PAGE_KB
+
+
+def _parse_kv(text: str, keys: tuple[str, ...]) -> list[int]:
+    vals = dict.fromkeys(keys, 0)
+    for line in text.splitlines():
+        k, _, v = line.partition(":")
+        if k in vals:
+            vals[k] = int(v.split()[0])
+    return [vals[k] for k in keys]
+
+
+def _cpu_times(text: str) -> list[tuple[int, int]]:
+    """(busy, total) jiffies per core from /proc/stat."""
+    out = []
+    for line in text.splitlines():
+        if line.startswith("cpu") and line[3:4].isdigit():
+            v = [int(x) for x in line.split()[1:]]
+            idle = v[3] + (v[4] if len(v) > 4 else 0)  # idle + iowait
+            out.append((sum(v) - idle, sum(v)))
+    return out
+
+
+class ProcSampler(threading.Thread):
+    """
+    Sample one process from /proc at a fixed interval until it exits or stop() is called.
+
+    Each sample records elapsed time, RSS, minor/major faults, storage read/write bytes, voluntary and
+    involuntary context switches, process CPU ticks, and the utilization of every core over the last interval.
+    The /proc files are opened once and re-read with pread, so sampling at 10 ms costs well under 1% of a core.
+    Unreadable sources (e.g. /proc/<pid>/io of another user's process) leave their columns at 0.
+    """
+
+    def __init__(self, pid: int, interval_s: float = DEFAULT_INTERVAL_MS / 1000) -> None:
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval_s = interval_s
+        self.columns: dict[str, list] = {name: [] for name in ["t_s", "rss_kb", *COUNTERS]}
+        self.core_util_pct: list[list[float]] = []
+        self._done = threading.Event()
+
+    def _open(self, name: str) -> _ProcFile | None:
+        try:
+            return _ProcFile(f"/proc/{self.pid}/{name}")
+        except OSError:
+            return None
+
+    def run(self) -> None:
+        stat, status, io = self._open("stat"), self._open("status"), self._open("io")
+        try:
+            cpu = _ProcFile("/proc/stat")
+        except OSError:
+            cpu = None
+        if stat is None:
+            return
+        files = [f for f in (stat, status, io, cpu) if f is not None]
+        prev_cores = _cpu_times(cpu.read()) if cpu is not None else []
+        t0 = time.perf_counter()
+        try:
+            while True:
+                try:
+                    minflt, majflt, ticks, rss_kb = _parse_stat(stat.read())
+                    ctxt = _parse_kv(status.read(), ("voluntary_ctxt_switches", "nonvoluntary_ctxt_switches")) if status else [0, 0]
+                    rw = _parse_kv(io.read(), ("read_bytes", "write_bytes")) if io else [0, 0]
+                except (OSError, ValueError, IndexError):
+                    break  # the process has exited
+                cols = self.columns
+                cols["t_s"].append(round(time.perf_counter() - t0, 4))
+                cols["rss_kb"].append(rss_kb)
+                cols["minflt"].append(minflt)
+                cols["majflt"].append(majflt)
+                cols["read_bytes"].append(rw[0])
+                cols["write_bytes"].append(rw[1])
+                cols["vol_ctxt"].append(ctxt[0])
+                cols["nonvol_ctxt"].append(ctxt[1])
+                cols["cpu_ticks"].append(ticks)
+                if cpu is not None:
+                    cores = _cpu_times(cpu.read())
+                    self.core_util_pct.append(
+                        [
+                            round((b1 - b0) * 100.0 / (t1 - t0_), 1) if t1 > t0_ else 0.0
+                            for (b0, t0_), (b1, t1) in zip(prev_cores, cores)
+                        ]
+                    )
+                    prev_cores = cores
+                if self._done.wait(self.interval_s):
+                    break
+        finally:
+            for f in files:
+                f.close()
+
+    def stop(self) -> None:
+        self._done.set()
+
+    def to_json(self) -> dict:
+        """Columnar document: one array per series, plus per-core utilization as one array per core."""
+        cores = len(self.core_util_pct[0]) if self.core_util_pct else 0
+        columns = dict(self.columns)
+        for i in range(cores):
+            columns[f"cpu{i}_util_pct"] = [row[i] if i < len(row) else None for row in self.core_util_pct]
+        return {
+            "schema_version": SCHEMA_VERSION,
+            "interval_s": self.interval_s,
+            "samples": len(self.columns["t_s"]),
+            "columns": columns,
+        }
+
+
+def summarize(doc: dict, rusage=None) -> dict:
+    """
+    Results metrics (resource_*) from a columnar sample document. When the sampled process was our child,
+    `rusage` from wait4() gives exact fault and context-switch totals, including the tail after the last sample.
+    """
+    cols = doc.get("columns") or {}
+
+    def delta(name: str) -> int:
+        v = cols.get(name) or []
+        return v[-1] - v[0] if len(v) >= 2 else (v[0] if v else 0)
+
+    t = cols.get("t_s") or []
+    wall = t[-1] - t[0] if len(t) >= 2 else 0.0
+    core_cols = [v for k, v in cols.items() if k.startswith("cpu") and k.endswith("_util_pct")]
+    core_means = [sum(x for x in c if x is not None) / len(c) for c in core_cols if c]
+    out = {
+        "resource_samples": float(doc.get("samples", 0)),
+        "resource_rss_mb_max": round(max(cols.get("rss_kb") or [0]) / 1024, 1),
+        "resource_minor_faults": float(delta("minflt")),
+        "resource_major_faults": float(delta("majflt")),
+        "resource_read_mb": round(delta("read_bytes") / (1024 * 1024), 2),
+        "resource_write_mb": round(delta("write_bytes") / (1024 * 1024), 2),
+        "resource_voluntary_ctx_switches": float(delta("vol_ctxt")),
+        "resource_involuntary_ctx_switches": float(delta("nonvol_ctxt")),
+        # Process CPU time over wall time: 100 = one core fully busy.
+        "resource_process_cpu_pct": round(delta("cpu_ticks") / _CLK_TCK / wall * 100.0, 1) if wall > 0 else 0.0,
+        "resource_core_util_pct_mean": round(sum(core_means) / len(core_means), 1) if core_means else 0.0,
+        "resource_core_util_pct_max": round(max(core_means), 1) if core_means else 0.0,
+    }
+    if rusage is not None:
+        out["resource_minor_faults"] = float(rusage.ru_minflt)
+        out["resource_major_faults"] = float(rusage.ru_majflt)
+        out["resource_voluntary_ctx_switches"] = float(rusage.ru_nvcsw)
+        out["resource_involuntary_ctx_switches"] = float(rusage.ru_nivcsw)
+    return out
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(
+        description="Sample RSS, page faults, I/O, context switches and per-core CPU of a process from /proc."
+    )
+    p.add_argument("--pid", type=int, default=0, help="Attach to a running process (alternative to '-- <command>')")
+    p.add_argument("--interval-ms", type=float, default=DEFAULT_INTERVAL_MS, help="Sampling interval")
+    p.add_argument("--out", default=str(Path("artifacts") / "resource_samples.json"), help="Columnar samples output")
+    p.add_argument("--results", default="", help="Optional results.json to merge resource_* summary metrics into")
+    p.add_argument("cmd", nargs=argparse.REMAINDER, help="Command to run and sample: '-- <command> [args...]'")
+    args = p.parse_args()
+
+    if not os.path.isdir("/proc"):
+        print("proc_sampler needs /proc (Linux)")
+        return 2
+    cmd = [c for c in args.cmd if c != "--"] if args.cmd else []
+    if bool(cmd) == bool(args.pid):
+        p.error("give exactly one of --pid or a command after '--'")
+
+    rusage = None
+    code = 0
+    interval = args.interval_ms / 1000
+    if cmd:
+        proc = subprocess.Popen(cmd)
+        sampler = ProcSampler(proc.pid, interval)
+        sampler.start()
+        _, status, rusage = os.wait4(proc.pid, 0)
+        code = os.waitstatus_to_exitcode(status)
+        proc.returncode = code
+    else:
+        if not os.path.isdir(f"/proc/{args.pid}"):
+            print(f"No such process: {args.pid}")
+            return 2
+        sampler = ProcSampler(args.pid, interval)
+        sampler.start()
+    try:
+        while sampler.is_alive():
+            sampler.join(0.5)
+    except KeyboardInterrupt:
+        pass
+    sampler.stop()
+    sampler.join()
+
+    doc = sampler.to_json()
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    # Compact separators: a long run at 100 ms is tens of thousands of numbers.
+    out.write_text(json.dumps(doc, separators=(",", ":")) + "\n", encoding="utf-8")
+    summary = summarize(doc, rusage)
+    print(f"Wrote: {out} ({doc['samples']} samples)")
+    for k, v in summary.items():
+        print(f"  {k}: {v}")
+
+    if args.results:
+        results_path = Path(args.results)
+        results = json.loads(results_path.read_text(encoding="utf-8"))
+        results.setdefault("metrics", {}).update(summary)
+        results_path.write_text(json.dumps(results, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"OK: updated {results_path}")
+    if cmd and code != 0:
+        print(f"command exited with {code}", file=sys.stderr)
+    return code
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
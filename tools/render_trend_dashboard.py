@@ -0,0 +1,315 @@
+"""
+Trend dashboard: SVG sparklines of load time p50/p95, peak memory and throughput across many packs.
+
+    python tools/render_trend_dashboard.py --discover <nightly_root> --out-dir _dashboard
+    python tools/render_trend_dashboard.py --store _store/evidence.sqlite --out-dir _dashboard
+
+One SVG per series (baseline / quant profile / backend / device CPU), plus index.html. A point is marked as a
+regression when it is worse than the median of the previous --window points by more than --threshold-pct.
+
+Rendering is incremental: the state file remembers every pack already read (by manifest path + size + mtime,
+or the store's last row id) and a digest of what each SVG was drawn from, so a refresh reads only new packs
+and rewrites only the charts whose series changed. A resealed pack replaces the point it contributed before.
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import os
+import re
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+
+from render_benchmark_card import _fmt_ms
+from validate_artifacts import discover_artifacts
+
+
+STATE_SCHEMA_VERSION = "0.2"
+# (panel title, [(metric, line label)], direction): +1 = higher is better, -1 = lower is better.
+PANELS = [
+    ("冷启动 Load time p50 / p95", [("load_time_ms_p50", "p50"), ("load_time_ms_p95", "p95")], -1),
+    ("峰值内存 Peak RSS", [("peak_memory_mb", "MB")], -1),
+    ("吞吐 Throughput (tokens/s, p50)", [("throughput_tokens_per_s_p50", "tok/s")], +1),
+]
+TRACKED = [metric for _, lines, _ in PANELS for metric, _ in lines]
+LINE_COLORS = ["#5fb3ff", "#ffb454"]
+WIDTH, PANEL_H, TOP, LEFT, RIGHT = 1200, 190, 110, 60, 60
+
+
+def _series_key(results: dict) -> str:
+    b = results.get("baseline") or {}
+    d = results.get("device") or {}
+    return " / ".join(str(x) for x in (b.get("name"), b.get("quant_profile"), b.get("backend"), d.get("cpu")))
+
+
+def _slug(key: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", key).strip("_")[:80] + "-" + hashlib.sha256(key.encode("utf-8")).hexdigest()[:8]
+
+
+def _fmt(metric: str, v: float) -> str:
+    if metric.startswith("load_time_ms"):
+        return _fmt_ms(v)
+    return f"{v:.0f}" if abs(v) >= 100 else f"{v:.2f}"
+
+
+def _load_state(path: Path | None) -> dict:
+    if path is not None:
+        try:
+            state = json.loads(path.read_text(encoding="utf-8"))
+            if state.get("schema_version") == STATE_SCHEMA_VERSION:
+                return state
+        except (OSError, ValueError, AttributeError):
+            pass
+    return {"schema_version": STATE_SCHEMA_VERSION, "seen": {}, "store_last_id": 0, "series": {}, "rendered": {}}
+
+
+def _add_point(state: dict, key: str, run_at: str, digest: str, metrics: dict) -> None:
+    points = state["series"].setdefault(key, [])
+    if any(p[1] == digest for p in points):
+        return
+    values = {m: float(metrics[m]) for m in TRACKED if isinstance(metrics.get(m), (int, float))}
+    points.append([run_at, digest, values])
+
+
+def _drop_point(state: dict, key: str, digest: str) -> None:
+    points = [p for p in state["series"].get(key, []) if p[1] != digest]
+    if points:
+        state["series"][key] = points
+    else:
+        state["series"].pop(key, None)
+
+
+def update_from_packs(state: dict, packs: list[Path]) -> int:
+    """Read packs that are new or whose manifest changed since the last refresh; returns how many were read.
+
+    `seen` maps each manifest path to [size, mtime_ns, series key, manifest digest], so a resealed pack drops the
+    point it contributed before (unless another path still holds a copy of the same manifest).
+    """
+    seen = state["seen"]
+    n = 0
+    for artifacts in packs:
+        manifest = artifacts / "manifest.json"
+        try:
+            st = manifest.stat()
+        except OSError:
+            continue  # unsealed pack
+        mark = [st.st_size, st.st_mtime_ns]
+        path_key = os.path.abspath(manifest)
+        old = seen.get(path_key)
+        if old is not None and old[:2] == mark:
+            continue
+        try:
+            digest = hashlib.sha256(manifest.read_bytes()).hexdigest()
+            results = json.loads((artifacts / "results.json").read_text(encoding="utf-8"))
+            env_path = artifacts / "env.json"
+            env = json.loads(env_path.read_text(encoding="utf-8")) if env_path.is_file() else {}
+        except (OSError, ValueError):
+            continue
+        # Same fallback as evidence_store.ingest_pack, so --discover and --store order points alike.
+        run_at = env.get("generated_at_utc") or datetime.fromtimestamp(st.st_mtime, timezone.utc).replace(
+            microsecond=0
+        ).isoformat()
+        key = _series_key(results)
+        if old is not None and old[2:] != [key, digest]:
+            seen.pop(path_key)
+            if not any(v[2:] == old[2:] for v in seen.values()):
+                _drop_point(state, old[2], old[3])
+        _add_point(state, key, run_at, digest, results.get("metrics") or {})
+        seen[path_key] = [*mark, key, digest]
+        n += 1
+    return n
+
+
+def update_from_store(state: dict, db: Path) -> int:
+    """Read rows of tools/evidence_store.py added since the last refresh; returns how many packs were read."""
+    con = sqlite3.connect(f"file:{db}?mode=ro", uri=True)
+    try:
+        rows = con.execute(
+            "SELECT id, manifest_sha256, run_at_utc, baseline_name, quant_profile, backend, device_cpu"
+            " FROM packs WHERE id > ? ORDER BY id",
+            (state["store_last_id"],),
+        ).fetchall()
+        if not rows:
+            return 0
+        marks = ",".join("?" * len(TRACKED))
+        metrics: dict[int, dict] = {}
+        for pack_id, name, value in con.execute(
+            f"SELECT pack_id, name, value FROM metrics WHERE name IN ({marks}) AND pack_id > ?",
+            (*TRACKED, state["store_last_id"]),
+        ):
+            metrics.setdefault(pack_id, {})[name] = value
+    finally:
+        con.close()
+    for pack_id, digest, run_at, name, quant, backend, cpu in rows:
+        key = " / ".join(str(x) for x in (name, quant, backend, cpu))
+        _add_point(state, key, run_at, digest, metrics.get(pack_id, {}))
+    state["store_last_id"] = rows[-1][0]
+    return len(rows)
+
+
+def regressions(values: list[float | None], direction: int, window: int, threshold_pct: float) -> list[bool]:
+    """Worse than the median of the previous `window` values by more than threshold_pct (needs 3 prior points)."""
+    flags = []
+    for i, v in enumerate(values):
+        prior = sorted(x for x in values[max(0, i - window) : i] if x is not None)
+        if v is None or len(prior) < 3:
+            flags.append(False)
+            continue
+        mid = len(prior) // 2
+        ref = prior[mid] if len(prior) % 2 else (prior[mid - 1] + prior[mid]) / 2
+        change_pct = (v - ref) / ref * 100.0 if ref else 0.0
+        flags.append(change_pct * -direction > threshold_pct)
+    return flags
+
+
+def render_series(key: str, points: list, window: int, threshold_pct: float) -> tuple[str, int]:
+    """SVG for one series and its number of regression markers; points are [run_at, digest, {metric: value}]."""
+    points = sorted(points, key=lambda p: (p[0], p[1]))
+    n = len(points)
+    height = TOP + PANEL_H * len(PANELS) + 40
+    plot_w = WIDTH - LEFT - RIGHT
+    out = []
+    flagged_total = 0
+    for pi, (title, lines, direction) in enumerate(PANELS):
+        y0 = TOP + pi * PANEL_H
+        series = [[p[2].get(metric) for p in points] for metric, _ in lines]
+        present = [v for s in series for v in s if v is not None]
+        out.append(f'  <rect class="card" x="{LEFT - 20}" y="{y0}" width="{plot_w + 40}" height="{PANEL_H - 20}" rx="14" />')
+        out.append(f'  <text class="h" x="{LEFT}" y="{y0 + 30}">{html.escape(title)}</text>')
+        if not present:
+            out.append(f'  <text class="note" x="{LEFT}" y="{y0 + 90}">no data</text>')
+            continue
+        lo, hi = min(present), max(present)
+        span = (hi - lo) or abs(hi) or 1.0
+        top, bottom = y0 + 50, y0 + PANEL_H - 45
+
+        def xy(i: int, v: float) -> tuple[float, float]:
+            x = LEFT + (plot_w * i / (n - 1) if n > 1 else plot_w / 2)
+            return round(x, 1), round(bottom - (v - lo) / span * (bottom - top), 1)
+
+        latest = []
+        for li, ((metric, label), values) in enumerate(zip(lines, series)):
+            color = LINE_COLORS[li % len(LINE_COLORS)]
+            coords = [xy(i, v) for i, v in enumerate(values) if v is not None]
+            pts = " ".join(f"{x},{y}" for x, y in coords)
+            out.append(f'  <polyline fill="none" stroke="{color}" stroke-width="2" points="{pts}" />')
+            for i, bad in enumerate(regressions(values, direction, window, threshold_pct)):
+                if bad:
+                    x, y = xy(i, values[i])
+                    flagged_total += 1
+                    tip = html.escape(f"{points[i][0]} {label} {_fmt(metric, values[i])}")
+                    out.append(f'  <circle class="reg" cx="{x}" cy="{y}" r="5"><title>{tip}</title></circle>')
+            last = next((v for v in reversed(values) if v is not None), None)
+            if last is not None:
+                latest.append(f"{label} {_fmt(metric, last)}")
+        metric0 = lines[0][0]
+        out.append(f'  <text class="v" x="{WIDTH - RIGHT}" y="{y0 + 30}" text-anchor="end">{html.escape(" / ".join(latest))}</text>')
+        out.append(f'  <text class="note" x="{LEFT - 10}" y="{top + 4}" text-anchor="end">{_fmt(metric0, hi)}</text>')
+        out.append(f'  <text class="note" x="{LEFT - 10}" y="{bottom + 4}" text-anchor="end">{_fmt(metric0, lo)}</text>')
+        out.append(f'  <text class="note" x="{LEFT}" y="{bottom + 24}">{html.escape(points[0][0][:10])}</text>')
+        out.append(
+            f'  <text class="note" x="{WIDTH - RIGHT}" y="{bottom + 24}" text-anchor="end">{html.escape(points[-1][0][:10])}</text>'
+        )
+
+    body = "\n".join(out)
+    svg = f"""<svg xmlns="http://www.w3.org/2000/svg" width="{WIDTH}" height="{height}" viewBox="0 0 {WIDTH} {height}">
+  <defs>
+    <style>
+      .bg {{ fill: #0b1220; }}
+      .card {{ fill: #121b2f; stroke: #1f2a44; stroke-width: 2; }}
+      .title {{ font: 700 30px -apple-system, Segoe UI, Arial, "Microsoft YaHei"; fill: #ffffff; }}
+      .sub {{ font: 500 16px -apple-system, Segoe UI, Arial, "Microsoft YaHei"; fill: #b7c3d6; }}
+      .h {{ font: 700 18px -apple-system, Segoe UI, Arial, "Microsoft YaHei"; fill: #d7e1f2; }}
+      .v {{ font: 700 18px ui-monospace, SFMono-Regular, Menlo, Consolas, "Liberation Mono", monospace; fill: #ffffff; }}
+      .note {{ font: 500 13px -apple-system, Segoe UI, Arial, "Microsoft YaHei"; fill: #8fa0bd; }}
+      .reg {{ fill: #ff5c5c; stroke: #0b1220; stroke-width: 1.5; }}
+    </style>
+  </defs>
+
+  <rect class="bg" x="0" y="0" width="{WIDTH}" height="{height}" />
+  <text class="title" x="{LEFT}" y="52">{html.escape(key)}</text>
+  <text class="sub" x="{LEFT}" y="82">{n} pack(s); red = worse than the median of the previous {window} by &gt; {threshold_pct:g}% ({flagged_total} marked)</text>
+
+{body}
+</svg>
+"""
+    return svg, flagged_total
+
+
+def _index_html(entries: list[tuple[str, str, int, int]]) -> str:
+    items = "\n".join(
+        f'<h2>{html.escape(key)} <small>({n} packs, {flags} regression marker(s))</small></h2>\n<img src="{slug}.svg" alt="{html.escape(key)}">'
+        for key, slug, n, flags in entries
+    )
+    return f"""<!doctype html>
+<meta charset="utf-8">
+<title>UMC trend dashboard</title>
+<style>body {{ background: #0b1220; color: #d7e1f2; font-family: Segoe UI, Arial, sans-serif; }} img {{ max-width: 100%; }}</style>
+{items}
+"""
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Render SVG trend charts (load time, peak memory, throughput) over many packs.")
+    p.add_argument("--discover", default="", help="Read every 'artifacts' directory under this root")
+    p.add_argument("--store", default="", help="Read from a tools/evidence_store.py database instead")
+    p.add_argument("--out-dir", required=True, help="Output directory for <series>.svg and index.html")
+    p.add_argument("--state", default="", help="Incremental state file (default: <out-dir>/.trend_state.json)")
+    p.add_argument("--window", type=int, default=7, help="Points in the rolling median a new point is compared with")
+    p.add_argument("--threshold-pct", type=float, default=5.0, help="Regression marker threshold")
+    p.add_argument("--full", action="store_true", help="Ignore the state file and re-read / re-render everything")
+    args = p.parse_args()
+    if bool(args.discover) == bool(args.store):
+        p.error("give exactly one of --discover or --store")
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    state_path = Path(args.state) if args.state else out_dir / ".trend_state.json"
+    state = _load_state(None if args.full else state_path)
+
+    if args.store:
+        if not Path(args.store).is_file():
+            print(f"Missing store: {args.store}")
+            return 2
+        try:
+            read = update_from_store(state, Path(args.store))
+        except sqlite3.DatabaseError as e:
+            print(f"Invalid store: {args.store}: {e}")
+            return 2
+    else:
+        read = update_from_packs(state, discover_artifacts(Path(args.discover)))
+
+    params = [args.window, args.threshold_pct]
+    rendered, entries = 0, []
+    live = {_slug(key) for key in state["series"]}
+    removed = [slug for slug in state["rendered"] if slug not in live]
+    for slug in removed:
+        # Series whose only packs were resealed into another series.
+        del state["rendered"][slug]
+        (out_dir / f"{slug}.svg").unlink(missing_ok=True)
+    for key in sorted(state["series"]):
+        points = state["series"][key]
+        slug = _slug(key)
+        digest = hashlib.sha256(json.dumps([params, sorted(points)], sort_keys=True).encode("utf-8")).hexdigest()
+        prev = state["rendered"].get(slug) or {}
+        if prev.get("digest") != digest or not (out_dir / f"{slug}.svg").is_file():
+            svg, flags = render_series(key, points, args.window, args.threshold_pct)
+            (out_dir / f"{slug}.svg").write_text(svg, encoding="utf-8")
+            prev = state["rendered"][slug] = {"digest": digest, "flags": flags}
+            rendered += 1
+        entries.append((key, slug, len(points), prev["flags"]))
+    if rendered or removed or not (out_dir / "index.html").is_file():
+        (out_dir / "index.html").write_text(_index_html(entries), encoding="utf-8")
+
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = state_path.with_name(state_path.name + ".tmp")
+    tmp.write_text(json.dumps(state, ensure_ascii=False, sort_keys=True) + "\n", encoding="utf-8")
+    os.replace(tmp, state_path)
+    print(f"OK: read {read} new pack(s); rendered {rendered} of {len(entries)} chart(s) into {out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
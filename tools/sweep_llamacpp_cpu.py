@@ -0,0 +1,323 @@
+import argparse
+import itertools
+import json
+import os
+import queue
+import string
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from bench_cache import DEFAULT_CACHE_PATH, DEFAULT_MAX_ENTRIES, DEFAULT_TTL_HOURS, BenchCache
+from bench_llamacpp_cpu import llama_bench_cmd, parse_llama_bench_json, percentile, pinning_supported, run_once
+from collect_env import env_fingerprint
+
+
+TOOLS_DIR = Path(__file__).resolve().parent
+# Grid keys -> llama-bench flags (also the placeholders accepted in a custom command template).
+GRID_KEYS = {"t": "-t", "b": "-b", "ub": "-ub", "p": "-p", "n": "-n"}
+OBJECTIVES = {
+    # name -> (metric key in a row, higher is better)
+    "tg": ("tg_tokens_per_s_p50", True),
+    "pp": ("pp_tokens_per_s_p50", True),
+    "load": ("load_time_ms_p50", False),
+}
+
+
+def parse_grid(specs: list[str]) -> dict[str, list[int]]:
+    """Parse ["t=2,4,8", "b=512"] (or a JSON object file via "@grid.json") into {"t": [2, 4, 8], "b": [512]}."""
+    grid: dict[str, list[int]] = {}
+    for spec in specs:
+        if spec.startswith("@"):
+            data = json.loads(Path(spec[1:]).read_text(encoding="utf-8"))
+            items = [(k, v if isinstance(v, list) else [v]) for k, v in data.items()]
+        else:
+            key, sep, values = spec.partition("=")
+            if not sep:
+                raise ValueError(f"grid entry must look like key=v1,v2: {spec!r}")
+            items = [(key.strip(), [v for v in values.split(",") if v.strip()])]
+        for key, values in items:
+            if key not in GRID_KEYS:
+                raise ValueError(f"unknown grid key {key!r} (allowed: {', '.join(GRID_KEYS)})")
+            grid[key] = [int(v) for v in values]
+    return grid
+
+
+def expand_grid(grid: dict[str, list[int]]) -> list[dict[str, int]]:
+    keys = list(grid)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(grid[k] for k in keys))]
+
+
+def core_slots(slot_size: int, parallel: int) -> list[set[int] | None]:
+    """
+    Disjoint core sets for concurrent configurations. Without pinning support (Linux with taskset) or with
+    parallel=1 there is a single unpinned slot, so configurations run one at a time.
+    """
+    if parallel <= 1 or not pinning_supported():
+        return [None]
+    cores = sorted(os.sched_getaffinity(0))
+    n = min(parallel, len(cores) // max(1, slot_size))
+    if n <= 1:
+        return [None]
+    return [set(cores[i * slot_size : (i + 1) * slot_size]) for i in range(n)]
+
+
+def template_fields(template: list[str]) -> set[str]:
+    """Placeholder names used in a command template ("{t}" -> "t"); raises ValueError on malformed braces."""
+    return {
+        field.split(".")[0].split("[")[0]
+        for part in template
+        for _, field, _, _ in string.Formatter().parse(part)
+        if field is not None
+    }
+
+
+def _config_cmd(args: argparse.Namespace, template: list[str], cfg: dict[str, int]) -> list[str]:
+    if template:
+        return [part.format(**cfg) for part in template]
+    return llama_bench_cmd(
+        args.llama_bench,
+        args.model,
+        cfg.get("p", args.prompt_tokens),
+        cfg.get("n", args.gen_tokens),
+        args.load_mode,
+        threads=cfg.get("t", 0),
+        batch=cfg.get("b", 0),
+        ubatch=cfg.get("ub", 0),
+    )
+
+
+def run_config(cmd: list[str], warmup: int, repeat: int, cpus: set[int] | None) -> dict:
+    """Warm-up runs (discarded), then `repeat` measured runs of one configuration."""
+    for _ in range(warmup):
+        run_once(cmd, cpus=cpus)
+    ms, peaks, failures = [], [], 0
+    tps: dict[str, list[float]] = {"pp": [], "tg": []}
+    for _ in range(repeat):
+        r = run_once(cmd, cpus=cpus)
+        if r.exit_code != 0:
+            failures += 1
+            continue
+        ms.append(r.ms)
+        if r.peak_rss_mb is not None:
+            peaks.append(r.peak_rss_mb)
+        for key, samples in parse_llama_bench_json(r.stdout).items():
+            tps[key] += samples
+    return {
+        "runs": repeat,
+        "failures": failures,
+        "load_time_ms_p50": percentile(ms, 50),
+        "load_time_ms_p95": percentile(ms, 95),
+        "pp_tokens_per_s_p50": percentile(tps["pp"], 50),
+        "tg_tokens_per_s_p50": percentile(tps["tg"], 50),
+        "peak_rss_mb": round(max(peaks), 1) if peaks else None,
+        "cpus": len(cpus) if cpus else None,
+    }
+
+
+def pick_best(rows: list[dict], objective: str) -> dict | None:
+    key, higher = OBJECTIVES[objective]
+    ok = [r for r in rows if not r["failures"] and r.get(key) is not None]
+    if not ok:
+        return None
+    return max(ok, key=lambda r: r[key]) if higher else min(ok, key=lambda r: r[key])
+
+
+def to_markdown(grid: dict[str, list[int]], rows: list[dict], best: dict | None, objective: str) -> str:
+    keys = list(grid)
+    cols = ["load_time_ms_p50", "load_time_ms_p95", "pp_tokens_per_s_p50", "tg_tokens_per_s_p50", "peak_rss_mb"]
+    lines = [
+        "## llama.cpp parameter sweep",
+        "",
+        f"Objective: {objective} ({OBJECTIVES[objective][0]}, {'higher' if OBJECTIVES[objective][1] else 'lower'} is better).",
+        "",
+        "| " + " | ".join(keys + cols + ["failures", ""]) + " |",
+        "|" + "---:|" * (len(keys) + len(cols) + 1) + "---|",
+    ]
+    for r in rows:
+        cells = [str(r["config"][k]) for k in keys] + ["-" if r[c] is None else f"{r[c]:g}" for c in cols]
+        cells += [str(r["failures"]), "**best**" if r is best else ""]
+        lines.append("| " + " | ".join(cells) + " |")
+    lines.append("")
+    if best is not None:
+        lines.append("Best configuration: " + ", ".join(f"{k}={best['config'][k]}" for k in keys))
+    else:
+        lines.append("Best configuration: none (every configuration failed)")
+    return "\n".join(lines) + "\n"
+
+
+def _apply_winner(args: argparse.Namespace, template: list[str], cfg: dict[str, int]) -> int:
+    """Full benchmark (cold/warm + soak) of the winner via bench_llamacpp_cpu.py, then apply_bench_to_results.py."""
+    bench_out = Path(args.winner_bench)
+    cmd = [
+        sys.executable, str(TOOLS_DIR / "bench_llamacpp_cpu.py"),
+        "--out", str(bench_out),
+        "--runs", str(args.repeat),
+        "--long-run-minutes", str(args.winner_long_run_minutes),
+    ]
+    if template:
+        cmd += ["--", *_config_cmd(args, template, cfg)]
+    else:
+        cmd += [
+            "--llama-bench", args.llama_bench,
+            "--model", args.model,
+            "--load-mode", args.load_mode,
+            "--prompt-tokens", str(cfg.get("p", args.prompt_tokens)),
+            "--gen-tokens", str(cfg.get("n", args.gen_tokens)),
+            "--threads", str(cfg.get("t", 0)),
+            "--batch-size", str(cfg.get("b", 0)),
+            "--ubatch-size", str(cfg.get("ub", 0)),
+        ]
+    sys.stdout.flush()
+    code = subprocess.call(cmd)
+    if code != 0:
+        return code
+    note = "Sweep winner: " + ", ".join(f"{k}={v}" for k, v in cfg.items()) + "."
+    return subprocess.call(
+        [
+            sys.executable, str(TOOLS_DIR / "apply_bench_to_results.py"),
+            "--bench", str(bench_out),
+            "--results", args.apply_results,
+            "--notes", note,
+        ]
+    )
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Sweep llama-bench over a -t/-b/-ub/-p/-n grid and pick the best config.")
+    p.add_argument("--llama-bench", default="", help="Path to llama-bench")
+    p.add_argument("--model", default="", help="Path to the GGUF model")
+    p.add_argument(
+        "--grid",
+        nargs="+",
+        required=True,
+        help="Grid as key=v1,v2 (keys: t b ub p n), or @grid.json with {\"t\": [4, 8], ...}",
+    )
+    p.add_argument("--prompt-tokens", type=int, default=8, help="Used when p is not in the grid")
+    p.add_argument("--gen-tokens", type=int, default=16, help="Used when n is not in the grid")
+    p.add_argument("--load-mode", choices=["mmap", "read"], default="mmap")
+    p.add_argument("--warmup", type=int, default=1, help="Discarded runs per configuration")
+    p.add_argument("--repeat", type=int, default=5, help="Measured runs per configuration")
+    p.add_argument("--objective", choices=list(OBJECTIVES), default="tg")
+    p.add_argument(
+        "--parallel",
+        type=int,
+        default=1,
+        help="Configurations run at once, each pinned to its own disjoint cores (Linux); 1 = one at a time",
+    )
+    p.add_argument("--out", default=str(Path(tempfile.gettempdir()) / "sw_public_sweep.json"), help="Sweep JSON")
+    p.add_argument("--md", default="", help="Markdown table for the evidence pack (e.g. artifacts/sweep.md)")
+    p.add_argument("--apply-results", default="", help="Benchmark the winner fully and apply it to this results.json")
+    p.add_argument("--winner-bench", default=str(Path(tempfile.gettempdir()) / "sw_public_bench.json"))
+    p.add_argument("--winner-long-run-minutes", type=float, default=30)
+    p.add_argument("--cache", default=str(DEFAULT_CACHE_PATH), help="Result cache file (keep it outside the repo)")
+    p.add_argument("--no-cache", action="store_true", help="Neither read nor write the result cache")
+    p.add_argument("--rebench", action="store_true", help="Re-measure every configuration and refresh the cache")
+    p.add_argument("--cache-ttl-hours", type=float, default=DEFAULT_TTL_HOURS, help="Cached results older than this are re-measured")
+    p.add_argument("--cache-max-entries", type=int, default=DEFAULT_MAX_ENTRIES, help="LRU bound on cached results")
+    p.add_argument("cmd", nargs=argparse.REMAINDER, help="Alternative to --llama-bench: '-- <command> {t} {b} ...'")
+    args = p.parse_args()
+
+    template = [c for c in args.cmd if c != "--"] if args.cmd else []
+    if not template and (not args.llama_bench or not args.model):
+        p.error("give --llama-bench and --model, or a command template after '--'")
+    try:
+        grid = parse_grid(args.grid)
+        fields = template_fields(template)
+    except (OSError, ValueError) as e:
+        p.error(str(e))
+    configs = expand_grid(grid)
+    if template:
+        missing = sorted(fields - set(grid))
+        if missing:
+            p.error(f"command template placeholder(s) not in --grid: {', '.join('{' + f + '}' for f in missing)}")
+
+    # A slot must hold the largest thread count in the grid so pinned configurations never share cores.
+    slots = core_slots(max(grid.get("t", [os.cpu_count() or 1])), args.parallel)
+    if args.parallel > 1 and len(slots) == 1:
+        print("NOTE: not enough cores (or no taskset / affinity support) for disjoint pinning; running one at a time")
+    print(f"== sweep llama.cpp (CPU): {len(configs)} configuration(s), {len(slots)} slot(s) ==")
+
+    cache = None if args.no_cache else BenchCache(Path(args.cache), args.cache_ttl_hours, args.cache_max_entries)
+    if cache is not None:
+        # Key parts shared by all configurations; the model digest is memoised across sweeps by (path, size, mtime).
+        binary_sha = cache.binary_sha256(template[0] if template else args.llama_bench)
+        model_sha = cache.file_sha256(args.model) if args.model else None
+        env_fp = env_fingerprint()
+
+    def _cache_key(cfg: dict[str, int]) -> str:
+        params = {
+            "config": cfg,
+            "p": cfg.get("p", args.prompt_tokens),
+            "n": cfg.get("n", args.gen_tokens),
+            "load_mode": args.load_mode,
+            "warmup": args.warmup,
+            "repeat": args.repeat,
+            "pinned": len(slots) > 1,
+            "template": template[1:],
+        }
+        return BenchCache.make_key(binary_sha, model_sha, params, env_fp)
+
+    free: queue.Queue = queue.Queue()
+    for slot in slots:
+        free.put(slot)
+
+    def _job(cfg: dict[str, int]) -> dict:
+        key = _cache_key(cfg) if cache is not None else None
+        cached = cache.get(key) if key is not None and not args.rebench else None
+        if cached is not None:
+            print(f"{cfg}: cached (load_p50={cached['load_time_ms_p50']}ms tg_p50={cached['tg_tokens_per_s_p50']})")
+            return {"config": cfg, **cached, "cached": True}
+        slot = free.get()
+        try:
+            row = run_config(_config_cmd(args, template, cfg), args.warmup, args.repeat, slot)
+        finally:
+            free.put(slot)
+        print(f"{cfg}: load_p50={row['load_time_ms_p50']}ms tg_p50={row['tg_tokens_per_s_p50']} failures={row['failures']}")
+        if key is not None and not row["failures"]:
+            cache.put(key, row)
+        return {"config": cfg, **row, "cached": False}
+
+    with ThreadPoolExecutor(max_workers=len(slots)) as pool:
+        rows = list(pool.map(_job, configs))
+    if cache is not None:
+        cache.save()
+        print(f"cache: {sum(r['cached'] for r in rows)} reused, {sum(not r['cached'] for r in rows)} measured ({cache.path})")
+
+    best = pick_best(rows, args.objective)
+    md = to_markdown(grid, rows, best, args.objective)
+    print(md, end="")
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "schema_version": "0.1",
+        "method": "llama.cpp-bench-cpu-sweep",
+        "grid": grid,
+        "warmup": args.warmup,
+        "repeat": args.repeat,
+        "objective": args.objective,
+        "slots": len(slots),
+        "rows": rows,
+        "best": best["config"] if best else None,
+    }
+    out.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    print(f"Wrote sweep json: {out}")
+    if args.md:
+        md_path = Path(args.md)
+        md_path.parent.mkdir(parents=True, exist_ok=True)
+        md_path.write_text(md, encoding="utf-8")
+        print(f"Wrote: {md_path}")
+
+    if best is None:
+        print("FAILED: no configuration completed without errors")
+        return 3
+    if args.apply_results:
+        return _apply_winner(args, template, best["config"])
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,210 @@
+"""
+In-process evidence-pack writer.
+
+    from umc import PackWriter
+
+    pack = PackWriter("artifacts")
+    pack.write_env()
+    pack.write_results(results)
+    pack.write_report(report_md)
+    pack.finalize()  # manifest.json + schema validation; raises PackError on failure
+
+Equivalent to running collect_env.py, make_manifest.py, verify_manifest.py and validate_artifacts.py one after
+another, without starting four interpreters. Files written through the writer are staged in memory, hashed
+from those bytes and moved into the artifacts directory atomically at finalize.
+"""
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+from collect_env import collect_env
+from hashing import sha256_file
+from make_manifest import _ManifestWriter, iter_files
+from tracing import TRACER, Tracer
+from validate_artifacts import DEFAULT_SCHEMAS_DIR, load_validators, validate_pack
+
+
+MANIFEST_NAME = "manifest.json"
+
+
+class PackError(RuntimeError):
+    """Pack validation failed; `code` is the validate_artifacts.py exit code (2 missing, 3 JSON, 4 schema, 5 report)."""
+
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+class PackWriter:
+    """
+    Stage env / results / report / extra files for an artifacts directory and commit them with a manifest.
+
+    write_*() only buffers the encoded bytes; nothing under `artifacts` changes until commit() (or finalize()),
+    which writes every staged file plus manifest.json into a sibling temp directory, makes them durable with
+    one batched sync, and renames them into place. A crash before the renames leaves the previous pack
+    untouched; the old manifest.json is removed before the first rename and the new one is renamed last, so a
+    crash during the renames leaves a pack without a manifest rather than a manifest over half-written files.
+    The manifest is computed from the staged buffers; only files placed in the directory by other means are
+    read back. Files are written in binary mode, so the bytes hashed are the bytes on disk (LF everywhere).
+    """
+
+    def __init__(self, artifacts: str | Path, durable: bool = True) -> None:
+        self.root = Path(artifacts)
+        self.durable = durable
+        self._staged: dict[str, bytes] = {}
+        # rel path -> (size, mtime_ns, sha256) of files this writer committed
+        self._written: dict[str, tuple[int, int, str]] = {}
+
+    def write_bytes(self, name: str, data: bytes) -> Path:
+        """Stage `data` as artifacts/<name>; returns the path it will have after commit()."""
+        rel = Path(name).as_posix()
+        if rel == MANIFEST_NAME or Path(name).is_absolute() or ".." in rel.split("/"):
+            raise ValueError(f"cannot stage {name!r}")
+        self._staged[rel] = bytes(data)
+        return self.root / rel
+
+    def write_text(self, name: str, text: str) -> Path:
+        return self.write_bytes(name, text.encode("utf-8"))
+
+    def write_json(self, name: str, obj) -> Path:
+        return self.write_text(name, json.dumps(obj, ensure_ascii=False, indent=2) + "\n")
+
+    def write_env(self, env: dict | None = None) -> dict:
+        env = env if env is not None else collect_env()
+        self.write_json("env.json", env)
+        return env
+
+    def write_results(self, results: dict) -> Path:
+        return self.write_json("results.json", results)
+
+    def write_report(self, text: str) -> Path:
+        return self.write_text("report.md", text)
+
+    def write_trace(self, tracer: Tracer = TRACER, chrome_path: str | Path | None = None) -> Path:
+        """Stage trace.json from `tracer`; the Chrome trace-event file is not part of the pack and is written now."""
+        if chrome_path:
+            tracer.write_chrome(Path(chrome_path))
+        return self.write_json("trace.json", tracer.to_json())
+
+    def _disk_sha256(self, rel: str, fs_path: str, st: os.stat_result) -> str:
+        known = self._written.get(rel)
+        if known is not None and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+            return known[2]
+        return sha256_file(Path(fs_path))
+
+    def manifest(self, recursive: bool = False) -> str:
+        """
+        manifest.json text for the pack as it will be after commit(): byte-identical to what
+        make_manifest.py --dir <artifacts> (v0.1) writes once the staged files are in place.
+        """
+        entries: dict[str, tuple[int, str]] = {}
+        if self.root.is_dir():
+            skip = {os.path.normcase(os.path.abspath(self.root / MANIFEST_NAME))}
+            for rel, fs_path, st in iter_files(self.root, recursive=recursive, skip=skip):
+                if rel not in self._staged:
+                    entries[rel] = (st.st_size, self._disk_sha256(rel, fs_path, st))
+        for rel, data in self._staged.items():
+            if recursive or "/" not in rel:
+                entries[rel] = (len(data), hashlib.sha256(data).hexdigest())
+        buf = io.StringIO()
+        writer = _ManifestWriter(buf)
+        # Same order as iter_files: per-directory listing sorted by normcase name, directories inline.
+        for rel in sorted(entries, key=lambda r: [os.path.normcase(part) for part in r.split("/")]):
+            size, sha = entries[rel]
+            writer.add({"path": rel, "size_bytes": size, "sha256": sha})
+        writer.close()
+        return buf.getvalue()
+
+    def commit(self, recursive: bool = False) -> Path:
+        """Write the staged files and manifest.json into `artifacts` atomically; returns the manifest path."""
+        files = dict(self._staged)
+        files[MANIFEST_NAME] = self.manifest(recursive).encode("utf-8")
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Same filesystem as the target, so the renames below are atomic.
+        stage = Path(tempfile.mkdtemp(prefix=f".{self.root.name}.staging-", dir=self.root.parent))
+        try:
+            fds = []
+            try:
+                for rel, data in files.items():
+                    path = stage / rel
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+                    fds.append(fd)
+                    view = memoryview(data)
+                    while view:
+                        view = view[os.write(fd, view) :]
+                if self.durable:
+                    _sync_batch(fds, stage)
+            finally:
+                for fd in fds:
+                    os.close(fd)
+
+            manifest_path = self.root / MANIFEST_NAME
+            manifest_path.unlink(missing_ok=True)
+            order = [rel for rel in files if rel != MANIFEST_NAME] + [MANIFEST_NAME]
+            for rel in order:
+                target = self.root / rel
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(stage / rel, target)
+                if rel != MANIFEST_NAME:
+                    st = target.stat()
+                    self._written[rel] = (st.st_size, st.st_mtime_ns, hashlib.sha256(files[rel]).hexdigest())
+            if self.durable:
+                _fsync_dir(self.root)
+        finally:
+            shutil.rmtree(stage, ignore_errors=True)
+        self._staged.clear()
+        return manifest_path
+
+    def validate(self, schemas_dir: Path = DEFAULT_SCHEMAS_DIR) -> tuple[int, str]:
+        return validate_pack(self.root, load_validators(schemas_dir))
+
+    def finalize(self, recursive: bool = False, schemas_dir: Path = DEFAULT_SCHEMAS_DIR) -> Path:
+        """commit() and validate the pack; raises PackError if validation fails."""
+        path = self.commit(recursive)
+        code, msg = self.validate(schemas_dir)
+        if code:
+            raise PackError(code, msg)
+        return path
+
+
+def _fsync_dir(path: Path) -> None:
+    # Persists the directory entries (renames). Directories cannot be opened this way on Windows, where
+    # NTFS journals the rename itself.
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _syncfs(fd: int) -> bool:
+    """Linux syncfs(2): flush every dirty page of the filesystem holding `fd` in one call."""
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        import ctypes
+
+        libc = ctypes.CDLL(None, use_errno=True)
+        return libc.syncfs(fd) == 0
+    except (OSError, AttributeError):
+        return False
+
+
+def _sync_batch(fds: list[int], stage: Path) -> None:
+    """Make the staged files durable: one syncfs() on Linux, else one fsync per file, then the directory."""
+    if not fds or not _syncfs(fds[0]):
+        for fd in fds:
+            os.fsync(fd)
+    _fsync_dir(stage)
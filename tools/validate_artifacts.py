@@ -1,9 +1,38 @@
 import argparse
+import functools
 import json
+import os
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
 REQUIRED_FILES = ["env.json", "results.json", "report.md", "manifest.json"]
+# Artifact file -> schema file under schemas/.
+SCHEMA_FILES = {
+    "env.json": "env.schema.json",
+    "results.json": "results.schema.json",
+    "manifest.json": "manifest.schema.json",
+}
+DEFAULT_SCHEMAS_DIR = Path(__file__).resolve().parents[1] / "schemas"
+
+Validator = Callable[[object, str], None]
+
+_TYPES: dict[str, Callable[[object], bool]] = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "null": lambda v: v is None,
+}
+_JSON_NAMES = {dict: "object", list: "array", str: "string", int: "integer", float: "number", bool: "boolean"}
+
+
+class SchemaError(ValueError):
+    pass
 
 
 def _die(msg: str, code: int) -> int:
@@ -12,106 +41,236 @@ def _die(msg: str, code: int) -> int:
 
 
 def _load_json(path: Path) -> dict:
-    return json.loads(path.read_text(encoding="utf-8"))
+    st = path.stat()
+    return _load_json_cached(str(path.resolve()), st.st_mtime_ns, st.st_size)
 
 
-def _require(obj: dict, key: str, typ) -> None:
-    if key not in obj:
-        raise KeyError(key)
-    if not isinstance(obj[key], typ):
-        if isinstance(typ, tuple):
-            expected = " | ".join(t.__name__ for t in typ)
-        else:
-            expected = typ.__name__
-        raise TypeError(f"{key} expected {expected}, got {type(obj[key]).__name__}")
+@functools.lru_cache(maxsize=4096)
+def _load_json_cached(path: str, mtime_ns: int, size: int) -> dict:
+    # Keyed on (path, mtime, size): a file shared by several packs is parsed once. Callers must not mutate.
+    return json.loads(Path(path).read_text(encoding="utf-8"))
 
 
-def _validate_env(env: dict) -> None:
-    _require(env, "schema_version", str)
-    _require(env, "generated_at_utc", str)
-    _require(env, "python", str)
-    _require(env, "platform", dict)
+def _json_type(v: object) -> str:
+    return "null" if v is None else _JSON_NAMES.get(type(v), type(v).__name__)
 
-    plat = env["platform"]
-    for k in ["system", "release", "version", "machine", "processor"]:
-        _require(plat, k, str)
 
+def _child(where: str, key: str) -> str:
+    return f"{where}.{key}" if where else key
 
-def _validate_results(results: dict) -> None:
-    _require(results, "schema_version", str)
-    _require(results, "data_status", str)
 
-    _require(results, "baseline", dict)
-    b = results["baseline"]
-    for k in ["name", "version", "quant_profile", "backend"]:
-        _require(b, k, str)
+def compile_schema(schema: dict) -> Validator:
+    """
+    Compile a JSON Schema subset into a plain Python closure, so each artifact is checked without re-walking
+    the schema document. Supported: type, required, properties, additionalProperties, items, enum, minimum,
+    maximum. Other keywords are ignored.
+    """
+    checks: list[Validator] = []
 
-    _require(results, "device", dict)
-    d = results["device"]
-    for k in ["os", "cpu", "ram_gb"]:
-        _require(d, k, str)
+    typ = schema.get("type")
+    if typ is not None:
+        names = typ if isinstance(typ, list) else [typ]
+        preds = [_TYPES[n] for n in names]
+        expected = " | ".join(names)
 
-    _require(results, "metrics", dict)
-    m = results["metrics"]
-    for k in ["load_time_ms_p50", "load_time_ms_p95", "peak_memory_mb", "long_run_minutes"]:
-        _require(m, k, (int, float))
-    _require(m, "crash_count", (int, float))
+        def _type(v: object, where: str) -> None:
+            if not any(pred(v) for pred in preds):
+                raise SchemaError(f"{where or '<root>'} expected {expected}, got {_json_type(v)}")
 
-    # Optional metrics (if present, must be numeric)
-    for k in ["throughput_tokens_per_s_p50", "throughput_tokens_per_s_p95"]:
-        if k in m and not isinstance(m[k], (int, float)):
-            raise TypeError(f"{k} expected number, got {type(m[k]).__name__}")
+        checks.append(_type)
 
+    if "enum" in schema:
+        allowed = list(schema["enum"])
 
-def _validate_manifest(manifest: dict) -> None:
-    _require(manifest, "schema_version", str)
-    _require(manifest, "files", list)
-    for it in manifest["files"]:
-        if not isinstance(it, dict):
-            raise TypeError("files[] item must be object")
-        for k in ["path", "sha256"]:
-            _require(it, k, str)
-        _require(it, "size_bytes", (int, float))
+        def _enum(v: object, where: str) -> None:
+            if v not in allowed:
+                raise SchemaError(f"{where or '<root>'} must be one of {allowed}, got {v!r}")
 
+        checks.append(_enum)
 
-def main() -> int:
-    p = argparse.ArgumentParser(description="Validate required evidence artifacts exist and have basic shape.")
-    p.add_argument("--artifacts", required=True, help="Artifacts directory (contains env/results/report/manifest).")
-    args = p.parse_args()
+    for key, op, fail in (("minimum", lambda v, b: v >= b, "<"), ("maximum", lambda v, b: v <= b, ">")):
+        if key in schema:
+            bound = schema[key]
+
+            def _bound(v: object, where: str, bound=bound, op=op, fail=fail) -> None:
+                if _TYPES["number"](v) and not op(v, bound):
+                    raise SchemaError(f"{where or '<root>'} is {fail} {bound}")
+
+            checks.append(_bound)
+
+    required = list(schema.get("required", []))
+    props = {k: compile_schema(v) for k, v in schema.get("properties", {}).items()}
+    additional = schema.get("additionalProperties", True)
+    extra = compile_schema(additional) if isinstance(additional, dict) else None
+    if required or props or additional is not True:
+
+        def _object(v: object, where: str) -> None:
+            if not isinstance(v, dict):
+                return
+            for k in required:
+                if k not in v:
+                    raise SchemaError(f"{_child(where, k)} is required")
+            for k, item in v.items():
+                sub = props.get(k)
+                if sub is not None:
+                    sub(item, _child(where, k))
+                elif additional is False:
+                    raise SchemaError(f"{_child(where, k)} is not allowed")
+                elif extra is not None:
+                    extra(item, _child(where, k))
+
+        checks.append(_object)
 
-    root = Path(args.artifacts)
+    if isinstance(schema.get("items"), dict):
+        item_check = compile_schema(schema["items"])
+
+        def _items(v: object, where: str) -> None:
+            if isinstance(v, list):
+                for i, item in enumerate(v):
+                    item_check(item, f"{where}[{i}]")
+
+        checks.append(_items)
+
+    def validate(v: object, where: str = "") -> None:
+        for check in checks:
+            check(v, where)
+
+    return validate
+
+
+@functools.lru_cache(maxsize=None)
+def _load_validator(path: str, mtime_ns: int) -> Validator:
+    return compile_schema(json.loads(Path(path).read_text(encoding="utf-8")))
+
+
+def load_validators(schemas_dir: Path = DEFAULT_SCHEMAS_DIR) -> dict[str, Validator]:
+    """Compiled validators per artifact file; cached per process (recompiled only if a schema file changes)."""
+    out = {}
+    for name, schema_name in SCHEMA_FILES.items():
+        path = schemas_dir / schema_name
+        out[name] = _load_validator(str(path), path.stat().st_mtime_ns)
+    return out
+
+
+def validate_pack(root: Path, validators: dict[str, Validator]) -> tuple[int, str]:
+    """Validate one artifacts directory; returns (exit code, message). Codes: 2 missing, 3 JSON, 4 schema, 5 report."""
     missing = [name for name in REQUIRED_FILES if not (root / name).is_file()]
     if missing:
-        print("Missing required artifacts:")
-        for name in missing:
-            print(f"- {root / name}")
-        return 2
+        return 2, "Missing required artifacts:\n" + "\n".join(f"- {root / name}" for name in missing)
 
     # JSON parse + structural validation
     try:
-        env = _load_json(root / "env.json")
-        results = _load_json(root / "results.json")
-        manifest = _load_json(root / "manifest.json")
+        docs = {name: _load_json(root / name) for name in SCHEMA_FILES}
     except Exception as e:
-        return _die(f"Invalid JSON: {e}", 3)
+        return 3, f"Invalid JSON: {e}"
 
     try:
-        _validate_env(env)
-        _validate_results(results)
-        _validate_manifest(manifest)
-    except Exception as e:
-        return _die(f"Schema check failed: {e}", 4)
+        for name, doc in docs.items():
+            validators[name](doc, "")
+    except SchemaError as e:
+        return 4, f"Schema check failed: {name}: {e}"
 
-    report = (root / "report.md").read_text(encoding="utf-8")
+    try:
+        report = (root / "report.md").read_text(encoding="utf-8")
+    except (OSError, ValueError) as e:
+        return 5, f"Cannot read report.md: {e}"
     if len(report.strip()) < 20:
-        print("report.md looks too short; please write at least a 1-page summary.")
-        return 5
+        return 5, "report.md looks too short; please write at least a 1-page summary."
 
-    print("OK: artifacts are present and minimally valid")
-    return 0
+    return 0, "OK: artifacts are present and minimally valid"
 
 
-if __name__ == "__main__":
-    raise SystemExit(main())
+def discover_artifacts(root: Path) -> list[Path]:
+    """Every directory named `artifacts` under root (hidden directories skipped, nested artifacts not searched)."""
+    found = []
+    for dirpath, dirnames, _ in os.walk(root):
+        if os.path.basename(dirpath) == "artifacts":
+            found.append(Path(dirpath))
+            dirnames[:] = []
+            continue
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+    return sorted(found)
+
+
+def _timed_validate(root: Path, validators: dict[str, Validator]) -> tuple[int, str, float]:
+    t0 = time.perf_counter()
+    try:
+        code, msg = validate_pack(root, validators)
+    except (OSError, ValueError) as e:
+        # One unreadable pack fails on its own instead of aborting the whole batch.
+        code, msg = 2, f"Cannot read artifacts: {e}"
+    return code, msg, (time.perf_counter() - t0) * 1000
 
 
+def main() -> int:
+    p = argparse.ArgumentParser(description="Validate required evidence artifacts exist and have basic shape.")
+    p.add_argument(
+        "--artifacts",
+        nargs="+",
+        default=[],
+        help="Artifacts directory (contains env/results/report/manifest). Several may be given.",
+    )
+    p.add_argument("--discover", default="", help="Batch mode: validate every 'artifacts' directory under this root")
+    p.add_argument("--jobs", type=int, default=8, help="Parallel packs in batch mode")
+    p.add_argument("--summary-json", default="", help="Batch mode: write a machine-readable summary to this path")
+    p.add_argument("--schemas", default=str(DEFAULT_SCHEMAS_DIR), help="Directory with *.schema.json")
+    args = p.parse_args()
+
+    if not args.artifacts and not args.discover:
+        p.error("one of --artifacts or --discover is required")
+
+    try:
+        validators = load_validators(Path(args.schemas))
+    except (OSError, ValueError) as e:
+        return _die(f"Cannot load schemas from {args.schemas}: {e}", 4)
+
+    packs = [Path(d) for d in args.artifacts]
+    base = Path(args.discover) if args.discover else None
+    if base is not None:
+        packs += discover_artifacts(base)
+        if not packs:
+            return _die(f"No artifacts directories found under {base}", 2)
+
+    if len(packs) == 1 and base is None and not args.summary_json:
+        code, msg = validate_pack(packs[0], validators)
+        print(msg)
+        return code
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        outcomes = list(pool.map(lambda d: _timed_validate(d, validators), packs))
+    wall_ms = (time.perf_counter() - t0) * 1000
+
+    rows = []
+    for d, (code, msg, ms) in zip(packs, outcomes):
+        # Report paths relative to the discovery root so the summary carries no local directories.
+        label = d.relative_to(base).as_posix() if base is not None and d.is_relative_to(base) else d.as_posix()
+        rows.append({"artifacts": label, "ok": code == 0, "code": code, "elapsed_ms": round(ms, 2), "message": msg})
+
+    print(f"{'status':<6} {'code':>4} {'ms':>8}  artifacts")
+    for r in rows:
+        print(f"{'PASS' if r['ok'] else 'FAIL':<6} {r['code']:>4} {r['elapsed_ms']:>8.2f}  {r['artifacts']}")
+        if not r["ok"]:
+            for line in r["message"].splitlines():
+                print(f"{'':>21}{line}")
+    failed = sum(1 for r in rows if not r["ok"])
+    print(f"{len(rows) - failed} passed, {failed} failed in {wall_ms:.1f}ms")
+
+    if args.summary_json:
+        out = Path(args.summary_json)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "schema_version": "0.1",
+            "passed": len(rows) - failed,
+            "failed": failed,
+            "elapsed_ms": round(wall_ms, 2),
+            "packs": rows,
+        }
+        out.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"Wrote: {out}")
+
+    return next((r["code"] for r in rows if r["code"]), 0)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
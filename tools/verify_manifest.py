@@ -1,27 +1,210 @@
 import argparse
 import hashlib
 import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from hashing import BACKENDS, sha256_file
+from merkle import chunk_count, hash_file_chunks, pack_root, read_chunk_leaf, root_from_hex
 
-def sha256_file(path: Path) -> str:
-    h = hashlib.sha256()
-    with path.open("rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
-    return h.hexdigest()
+
+STATE_SCHEMA_VERSION = "0.1"
+
+
+def _timed_sha256(path: Path, backend: str = "auto") -> tuple[str, float]:
+    t0 = time.perf_counter()
+    sha = sha256_file(path, backend=backend)
+    return sha, time.perf_counter() - t0
+
+
+def _mb_s(size: int, seconds: float) -> float:
+    return (size / (1024 * 1024)) / seconds if seconds > 0 else 0.0
+
+
+def _parse_range(spec: str) -> tuple[str, int, int]:
+    # PATH:START-END, byte offsets inclusive (like an HTTP Range header).
+    rel, _, span = spec.rpartition(":")
+    start_s, _, end_s = span.partition("-")
+    if not rel or not start_s or not end_s:
+        raise ValueError(f"invalid --range (expected PATH:START-END): {spec}")
+    start, end = int(start_s), int(end_s)
+    if start < 0 or end < start:
+        raise ValueError(f"invalid --range byte span: {spec}")
+    return rel, start, end
+
+
+class _ResumeState:
+    """Per-file count of verified leading chunks, persisted so an interrupted run can continue."""
+
+    def __init__(self, path: Path, pack_root_hex: str) -> None:
+        self.path = path
+        self._root = pack_root_hex
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self.files: dict[str, dict] = {}
+        if path.is_file():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except Exception:
+                data = {}
+            if data.get("schema_version") == STATE_SCHEMA_VERSION and data.get("pack_root") == pack_root_hex:
+                self.files = data.get("files") or {}
+
+    def start_chunk(self, rel: str, st: os.stat_result) -> int:
+        e = self.files.get(rel)
+        if e and e.get("size") == st.st_size and e.get("mtime_ns") == st.st_mtime_ns:
+            return int(e.get("next_chunk", 0))
+        return 0
+
+    def sha256_verified(self, rel: str, st: os.stat_result) -> bool:
+        e = self.files.get(rel)
+        return bool(e and e.get("size") == st.st_size and e.get("mtime_ns") == st.st_mtime_ns and e.get("sha256_ok"))
+
+    def advance(self, rel: str, st: os.stat_result, next_chunk: int, sha256_ok: bool = False) -> None:
+        with self._lock:
+            self.files[rel] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "next_chunk": next_chunk}
+            if sha256_ok:
+                self.files[rel]["sha256_ok"] = True
+            if time.monotonic() - self._last_flush >= 2.0:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        data = {"schema_version": STATE_SCHEMA_VERSION, "pack_root": self._root, "files": self.files}
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False) + "\n", encoding="utf-8")
+        os.replace(tmp, self.path)
+        self._last_flush = time.monotonic()
+
+
+def _verify_chunks(
+    rel: str,
+    path: Path,
+    st: os.stat_result,
+    item: dict,
+    chunk_size: int,
+    indices: range,
+    state: _ResumeState | None,
+    full=None,
+) -> tuple[list[int], int, float]:
+    """Hash only the selected chunks; returns (bad chunk indices, bytes read, seconds).
+
+    `full` (a hashlib object) is fed every chunk in order; only meaningful when `indices` starts at chunk 0.
+    """
+    t0 = time.perf_counter()
+    bad: list[int] = []
+    expected = item["chunks"]
+    with path.open("rb", buffering=0) as f:
+        for idx in indices:
+            if read_chunk_leaf(f, idx, chunk_size, full) != expected[idx]:
+                bad.append(idx)
+            elif state is not None and not bad:
+                state.advance(rel, st, idx + 1)
+    nbytes = min(st.st_size, indices.stop * chunk_size) - min(st.st_size, indices.start * chunk_size)
+    return bad, nbytes, time.perf_counter() - t0
+
+
+def _verify_full_merkle(path: Path, item: dict, chunk_size: int) -> tuple[str, list[int], float]:
+    """One pass over the whole file: full sha256 plus the indices of chunks that differ."""
+    t0 = time.perf_counter()
+    sha, leaves, _ = hash_file_chunks(path, chunk_size)
+    bad = [i for i, (got, exp) in enumerate(zip(leaves, item["chunks"])) if got != exp]
+    return sha, bad, time.perf_counter() - t0
+
+
+def _check_merkle_structure(m: dict) -> list[str]:
+    problems = []
+    merkle = m["merkle"]
+    chunk_size = merkle.get("chunk_size")
+    if not isinstance(chunk_size, int) or chunk_size <= 0:
+        return [f"Merkle: invalid chunk_size {chunk_size!r}"]
+    for item in m.get("files", []):
+        rel = item.get("path")
+        chunks = item.get("chunks")
+        if not isinstance(chunks, list) or not isinstance(item.get("merkle_root"), str):
+            problems.append(f"Merkle: {rel} has no chunks/merkle_root")
+            continue
+        if len(chunks) != chunk_count(int(item.get("size_bytes", 0)), chunk_size):
+            problems.append(f"Merkle: {rel} chunk count {len(chunks)} does not match size_bytes")
+        elif root_from_hex(chunks) != item["merkle_root"]:
+            problems.append(f"Merkle: {rel} merkle_root does not match its chunk hashes")
+    if not problems and pack_root(m.get("files", [])) != merkle.get("root"):
+        problems.append("Merkle: pack root does not match file entries")
+    return problems
 
 
 def main() -> int:
     p = argparse.ArgumentParser(description="Verify manifest.json (size + sha256).")
     p.add_argument("--manifest", required=True, help="Path to artifacts/manifest.json")
+    p.add_argument("--jobs", type=int, default=1, help="Parallel hashing workers (default: 1 = serial)")
+    p.add_argument("--sample", type=int, default=0, help="Quick mode: hash only N randomly chosen files (sizes are always checked)")
+    p.add_argument("--seed", type=int, default=0, help="Random seed for --sample")
+    p.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="Quick mode: hash only files modified after manifest.json was written (sizes are always checked)",
+    )
+    p.add_argument("--hash-backend", choices=BACKENDS, default="auto", help="File hashing backend (see tools/hashing.py)")
+    p.add_argument("--throughput", action="store_true", help="Print per-file hashing throughput (MB/s)")
+    p.add_argument("--expect-root", default="", help="v0.2: required pack root digest (hex), e.g. from a release note")
+    p.add_argument(
+        "--range",
+        action="append",
+        default=[],
+        help="v0.2: verify only the chunks covering PATH:START-END (inclusive byte offsets; repeatable)",
+    )
+    p.add_argument("--resume", default="", help="v0.2: progress file; an interrupted run continues where it stopped")
     args = p.parse_args()
 
     manifest_path = Path(args.manifest)
     root = manifest_path.parent
     m = json.loads(manifest_path.read_text(encoding="utf-8"))
 
+    merkle = m.get("merkle") if isinstance(m.get("merkle"), dict) else None
+    if merkle is None and (args.expect_root or args.range or args.resume):
+        print("--expect-root/--range/--resume require a v0.2 manifest with a merkle block (make_manifest.py --merkle)")
+        return 2
+    try:
+        ranges = [_parse_range(s) for s in args.range]
+    except ValueError as e:
+        print(str(e))
+        return 2
+
     bad = 0
+    chunk_size = 0
+    if merkle is not None:
+        # The chunk lists, file roots and pack root must agree before any file is read.
+        problems = _check_merkle_structure(m)
+        for msg in problems:
+            print(msg)
+        if problems:
+            print(f"FAILED: {len(problems)} problem(s) found")
+            return 2
+        chunk_size = merkle["chunk_size"]
+        if args.expect_root and merkle["root"].lower() != args.expect_root.strip().lower():
+            print(f"Pack root mismatch: expected={args.expect_root.strip()} manifest={merkle['root']}")
+            print("FAILED: 1 problem(s) found")
+            return 2
+
+    wanted: dict[str, list[tuple[int, int]]] = {}
+    for rel, start, end in ranges:
+        wanted.setdefault(rel, []).append((start, end))
+    known = {item.get("path") for item in m.get("files", [])}
+    for rel in wanted:
+        if rel not in known:
+            print(f"Not in manifest: {rel}")
+            bad += 1
+
+    # Pass 1: existence + size (stat only). A size mismatch already proves the file changed, so it is not hashed.
+    to_hash: list[tuple[str, Path, os.stat_result, dict]] = []
+    manifest_mtime_ns = manifest_path.stat().st_mtime_ns
     for item in m.get("files", []):
         rel = item.get("path")
         expected_size = item.get("size_bytes")
@@ -29,28 +212,154 @@ def main() -> int:
         if not rel:
             bad += 1
             continue
+        if wanted and rel not in wanted:
+            continue
         path = root / rel
         if not path.is_file():
             print(f"Missing: {path}")
             bad += 1
             continue
-        size = path.stat().st_size
-        sha = sha256_file(path)
-        if expected_size is not None and size != expected_size:
-            print(f"Size mismatch: {rel} expected={expected_size} actual={size}")
-            bad += 1
-        if expected_sha and sha.lower() != str(expected_sha).lower():
-            print(f"SHA256 mismatch: {rel}")
+        st = path.stat()
+        if expected_size is not None and st.st_size != expected_size:
+            print(f"Size mismatch: {rel} expected={expected_size} actual={st.st_size}")
             bad += 1
+            continue
+        if not expected_sha and merkle is None:
+            continue
+        if rel in wanted:
+            past = [(s, e) for s, e in wanted[rel] if s >= st.st_size]
+            if past:
+                s, e = past[0]
+                print(f"Range out of bounds: {rel}:{s}-{e} (size {st.st_size})")
+                bad += 1
+                continue
+        if args.changed_only and st.st_mtime_ns <= manifest_mtime_ns:
+            continue
+        to_hash.append((rel, path, st, item))
+
+    skipped = 0
+    if args.sample > 0 and len(to_hash) > args.sample:
+        skipped = len(to_hash) - args.sample
+        to_hash = random.Random(args.seed).sample(to_hash, args.sample)
+
+    state = _ResumeState(Path(args.resume), merkle["root"]) if args.resume else None
+    lock = threading.Lock()
+    totals = {"bytes": 0, "bad": 0}
+
+    def _report(rel: str, nbytes: int, seconds: float) -> None:
+        if args.throughput:
+            print(f"Hashed: {rel} {nbytes} bytes in {seconds * 1000:.1f}ms ({_mb_s(nbytes, seconds):.1f} MB/s)")
+
+    def _report_chunks(rel: str, bad_chunks: list[int]) -> None:
+        spans = ", ".join(f"#{i} bytes {i * chunk_size}-{(i + 1) * chunk_size - 1}" for i in bad_chunks[:10])
+        more = f" (+{len(bad_chunks) - 10} more)" if len(bad_chunks) > 10 else ""
+        print(f"Chunk mismatch: {rel} {spans}{more}")
+
+    def _one(job: tuple[str, Path, os.stat_result, dict]) -> None:
+        rel, path, st, item = job
+        problems = 0
+        if merkle is None:
+            sha, seconds = _timed_sha256(path, args.hash_backend)
+            nbytes = st.st_size
+            with lock:
+                _report(rel, nbytes, seconds)
+                if sha.lower() != str(item["sha256"]).lower():
+                    print(f"SHA256 mismatch: {rel}")
+                    problems += 1
+        elif rel in wanted or state is not None:
+            # Chunk-only path: leaves are checked against the (already self-consistent) chunk list.
+            n = chunk_count(st.st_size, chunk_size)
+            full = None
+            if rel in wanted:
+                idx = sorted({i for s, e in wanted[rel] for i in range(s // chunk_size, min(n - 1, e // chunk_size) + 1)})
+                spans = [range(i, i + 1) for i in idx]
+            else:
+                start = state.start_chunk(rel, st)
+                spans = [range(start, n)]
+                full = hashlib.sha256() if start == 0 else None
+            bad_chunks: list[int] = []
+            nbytes, seconds = 0, 0.0
+            for span in spans:
+                b, nb, sec = _verify_chunks(rel, path, st, item, chunk_size, span, state if rel not in wanted else None, full)
+                bad_chunks += b
+                nbytes += nb
+                seconds += sec
+            sha = None
+            if rel not in wanted and not bad_chunks and item.get("sha256") and not state.sha256_verified(rel, st):
+                # sha256 is not covered by the merkle tree: check it once the whole file is verified. A run that
+                # resumed mid-file has no running digest for the prefix, so that file is hashed once more.
+                if full is not None:
+                    sha = full.hexdigest()
+                else:
+                    sha, sec = _timed_sha256(path, args.hash_backend)
+                    nbytes += st.st_size
+                    seconds += sec
+            with lock:
+                _report(rel, nbytes, seconds)
+                if bad_chunks:
+                    _report_chunks(rel, bad_chunks)
+                    problems += 1
+                elif sha is not None:
+                    if sha.lower() != str(item["sha256"]).lower():
+                        print(f"SHA256 mismatch: {rel}")
+                        problems += 1
+                    else:
+                        state.advance(rel, st, n, sha256_ok=True)
+        else:
+            sha, bad_chunks, seconds = _verify_full_merkle(path, item, chunk_size)
+            nbytes = st.st_size
+            with lock:
+                _report(rel, nbytes, seconds)
+                if bad_chunks:
+                    _report_chunks(rel, bad_chunks)
+                    problems += 1
+                elif item.get("sha256") and sha.lower() != str(item["sha256"]).lower():
+                    print(f"SHA256 mismatch: {rel}")
+                    problems += 1
+        with lock:
+            totals["bytes"] += nbytes
+            totals["bad"] += problems
+
+    # Pass 2: hash what survived the size check.
+    t0 = time.perf_counter()
+    try:
+        if args.jobs > 1 and len(to_hash) > 1:
+            with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+                list(pool.map(_one, to_hash))
+        else:
+            for job in to_hash:
+                _one(job)
+    except KeyboardInterrupt:
+        if state is not None:
+            state.flush()
+            print(f"Interrupted: progress saved to {state.path}; rerun with the same --resume to continue")
+        raise
+    wall = time.perf_counter() - t0
+    bad += totals["bad"]
+
+    if to_hash:
+        total_bytes = totals["bytes"]
+        print(
+            f"Hashed {len(to_hash)} file(s), {total_bytes / (1024 * 1024):.1f} MB in {wall:.2f}s "
+            f"({_mb_s(total_bytes, wall):.1f} MB/s, jobs={max(1, args.jobs)})"
+        )
+    if skipped:
+        print(f"NOTE: --sample hashed {len(to_hash)} of {len(to_hash) + skipped} candidate file(s)")
+
+    if state is not None:
+        if bad:
+            state.flush()
+        elif state.path.is_file():
+            state.path.unlink()
 
     if bad:
         print(f"FAILED: {bad} problem(s) found")
         return 2
+    if merkle is not None and not wanted and not skipped and not args.changed_only:
+        print(f"Pack root: {merkle['root']}")
     print("OK: manifest verified")
     return 0
 
 
 if __name__ == "__main__":
     raise SystemExit(main())
-
-